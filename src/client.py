@@ -5,531 +5,988 @@
 
 import argparse
 import asyncio
+import functools
 import json
 import os
+import shlex
 import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+# The CLI's help text is English-only, so bypass argparse's gettext lookups:
+# every add_argument() call funnels its help string through argparse._, which
+# otherwise does a translation-catalog lookup per string at parser build time.
+argparse._ = lambda message: message
+
+
+def _iso8601(value):
+    """argparse type that rejects malformed ISO8601 timestamps client-side.
+
+    Validating here turns a bad --start-time/--end-time into an immediate
+    usage error instead of a full server round trip. The original string is
+    forwarded unchanged; the server still owns the UTC interpretation.
+    """
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"not an ISO8601 timestamp: {value!r}"
+        ) from None
+    return value
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
 
 # Set up argument parser for the CLI
 parser = argparse.ArgumentParser(description="CloudWatch Logs MCP Client")
+parser.add_argument("--profile", help="AWS profile name to use for credentials")
+parser.add_argument("--region", help="AWS region name to use for API calls")
 parser.add_argument(
-    "--profile", type=str, help="AWS profile name to use for credentials"
+    "--raw",
+    action="store_true",
+    help="Print responses as received, without JSON re-formatting",
 )
-parser.add_argument("--region", type=str, help="AWS region name to use for API calls")
 subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
-# List log groups command
-list_groups_parser = subparsers.add_parser(
-    "list-groups", help="List CloudWatch log groups"
-)
-list_groups_parser.add_argument("--prefix", help="Filter log groups by name prefix")
-list_groups_parser.add_argument(
-    "--limit",
+# Shared --profile/--region options: one pair of Action objects is reused by
+# every subparser via parents=[...] instead of 15 duplicate registrations
+_aws_parent = argparse.ArgumentParser(add_help=False)
+_aws_parent.add_argument("--profile", help="AWS profile name to use for credentials")
+_aws_parent.add_argument("--region", help="AWS region name to use for API calls")
+
+# Shared time-window options for the Insights-backed commands; the
+# hours-vs-explicit-range precedence is applied once in _call_arguments()
+_time_window_parent = argparse.ArgumentParser(add_help=False)
+_time_window_parent.add_argument(
+    "--hours",
     type=int,
-    default=50,
-    help="Maximum number of log groups to return (default: 50)",
+    default=24,
+    help="Number of hours to look back (default: 24)",
 )
-list_groups_parser.add_argument(
-    "--next-token", help="Token for pagination to get the next set of results"
-)
-list_groups_parser.add_argument(
-    "--use-tool", action="store_true", help="Use the tool interface instead of resource"
+_time_window_parent.add_argument(
+    "--start-time",
+    type=_iso8601,
+    help="Start time (ISO8601, e.g. 2024-06-01T00:00:00Z); naive values are treated as UTC",
 )
-list_groups_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
+_time_window_parent.add_argument(
+    "--end-time",
+    type=_iso8601,
+    help="End time (ISO8601, e.g. 2024-06-01T23:59:59Z); naive values are treated as UTC",
 )
-list_groups_parser.add_argument("--region", help="AWS region name to use for API calls")
 
-# Get log group details command
-group_details_parser = subparsers.add_parser(
-    "group-details", help="Get detailed information about a log group"
-)
-group_details_parser.add_argument("log_group_name", help="The name of the log group")
-group_details_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
-)
-group_details_parser.add_argument(
-    "--region", help="AWS region name to use for API calls"
-)
+# Set in main(); skips the parse/re-format pass on string payloads. True when
+# --raw is given or stdout is not a TTY (piped/redirected output goes to jq,
+# grep, or a file, where re-indenting only burns CPU and changes the bytes).
+_raw_output = False
 
-# List log streams command
-list_streams_parser = subparsers.add_parser(
-    "list-streams", help="List log streams for a specific log group"
-)
-list_streams_parser.add_argument("log_group_name", help="The name of the log group")
-list_streams_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
-)
-list_streams_parser.add_argument(
-    "--region", help="AWS region name to use for API calls"
-)
+# Cap on concurrent per-log-group tool calls for fanned-out commands
+FANOUT_LIMIT = 10
 
-# Get log events command
-get_events_parser = subparsers.add_parser(
-    "get-events", help="Get log events from a specific log stream"
-)
-get_events_parser.add_argument("log_group_name", help="The name of the log group")
-get_events_parser.add_argument("log_stream_name", help="The name of the log stream")
-get_events_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
-)
-get_events_parser.add_argument("--region", help="AWS region name to use for API calls")
+# CloudWatch Logs Insights StartQuery accepts at most 50 log groups per call
+INSIGHTS_MAX_LOG_GROUPS = 50
 
-# Get log sample command
-sample_parser = subparsers.add_parser(
-    "sample", help="Get a sample of recent logs from a log group"
-)
-sample_parser.add_argument("log_group_name", help="The name of the log group")
-sample_parser.add_argument(
-    "--limit", type=int, default=10, help="Number of logs to sample (default: 10)"
-)
-sample_parser.add_argument("--profile", help="AWS profile name to use for credentials")
-sample_parser.add_argument("--region", help="AWS region name to use for API calls")
+# Path to the MCP server script, resolved once at import instead of on every
+# invocation (Path.resolve touches the filesystem)
+SERVER_PATH = str(Path(__file__).resolve().parent / "cw_mcp_server" / "server.py")
 
-# Get recent errors command
-errors_parser = subparsers.add_parser(
-    "recent-errors", help="Get recent error logs from a log group"
-)
-errors_parser.add_argument(
-    "log_group_name", help="The name of the log group to analyze"
-)
-errors_parser.add_argument(
-    "--hours", type=int, default=24, help="Number of hours to look back (default: 24)"
-)
-errors_parser.add_argument("--profile", help="AWS profile name to use for credentials")
-errors_parser.add_argument("--region", help="AWS region name to use for API calls")
+# Resolve the JSON codec once at import: orjson's Rust parser/encoder when it
+# is installed, stdlib json otherwise. Both encoders produce 2-space-indented
+# bytes, and both parsers raise a ValueError subclass on bad input.
+try:
+    import orjson
 
-# Get log metrics command
-metrics_parser = subparsers.add_parser(
-    "metrics", help="Get log volume metrics for a log group"
-)
-metrics_parser.add_argument(
-    "log_group_name", help="The name of the log group to analyze"
-)
-metrics_parser.add_argument(
-    "--hours", type=int, default=24, help="Number of hours to look back (default: 24)"
-)
-metrics_parser.add_argument("--profile", help="AWS profile name to use for credentials")
-metrics_parser.add_argument("--region", help="AWS region name to use for API calls")
+    _loads = orjson.loads
 
-# Analyze log structure command
-structure_parser = subparsers.add_parser(
-    "structure", help="Analyze the structure of logs in a log group"
-)
-structure_parser.add_argument(
-    "log_group_name", help="The name of the log group to analyze"
-)
-structure_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
-)
-structure_parser.add_argument("--region", help="AWS region name to use for API calls")
+    def _dumps_bytes(obj) -> bytes:
+        return orjson.dumps(
+            obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+except ImportError:
+    _loads = json.loads
 
-# Get analyze logs prompt command
-prompt_parser = subparsers.add_parser(
-    "get-prompt", help="Get a prompt for analyzing CloudWatch logs"
-)
-prompt_parser.add_argument(
-    "log_group_name", help="The name of the log group to analyze"
-)
-prompt_parser.add_argument("--profile", help="AWS profile name to use for credentials")
-prompt_parser.add_argument("--region", help="AWS region name to use for API calls")
+    def _dumps_bytes(obj) -> bytes:
+        return json.dumps(obj, indent=2, default=str).encode()
 
-# Get list groups prompt command
-list_prompt_parser = subparsers.add_parser(
-    "list-prompt", help="Get a prompt for listing CloudWatch log groups"
-)
-list_prompt_parser.add_argument(
-    "--prefix", help="Optional prefix to filter log groups by name"
-)
-list_prompt_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
-)
-list_prompt_parser.add_argument("--region", help="AWS region name to use for API calls")
 
-# Search logs command
-search_parser = subparsers.add_parser(
-    "search", help="Search for patterns in CloudWatch logs"
-)
-search_parser.add_argument("log_group_name", help="The name of the log group to search")
-search_parser.add_argument(
-    "query", help="The search query (CloudWatch Logs Insights syntax)"
-)
-search_parser.add_argument(
-    "--hours", type=int, default=24, help="Number of hours to look back (default: 24)"
-)
-search_parser.add_argument(
-    "--start-time",
-    type=str,
-    help="Start time (ISO8601, e.g. 2024-06-01T00:00:00Z); naive values are treated as UTC",
-)
-search_parser.add_argument(
-    "--end-time",
-    type=str,
-    help="End time (ISO8601, e.g. 2024-06-01T23:59:59Z); naive values are treated as UTC",
-)
-search_parser.add_argument("--profile", help="AWS profile name to use for credentials")
-search_parser.add_argument("--region", help="AWS region name to use for API calls")
+def _write_json(obj) -> None:
+    """Serialize obj once and write it to stdout in a single buffered call.
 
-# Search multiple log groups command
-search_multi_parser = subparsers.add_parser(
-    "search-multi", help="Search for patterns across multiple CloudWatch log groups"
-)
-search_multi_parser.add_argument(
-    "log_group_names", nargs="+", help="List of log group names to search"
-)
-search_multi_parser.add_argument(
-    "query", help="The search query (CloudWatch Logs Insights syntax)"
-)
-search_multi_parser.add_argument(
-    "--hours", type=int, default=24, help="Number of hours to look back (default: 24)"
-)
-search_multi_parser.add_argument(
-    "--start-time",
-    type=str,
-    help="Start time (ISO8601, e.g. 2024-06-01T00:00:00Z); naive values are treated as UTC",
-)
-search_multi_parser.add_argument(
-    "--end-time",
-    type=str,
-    help="End time (ISO8601, e.g. 2024-06-01T23:59:59Z); naive values are treated as UTC",
-)
-search_multi_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
-)
-search_multi_parser.add_argument(
-    "--region", help="AWS region name to use for API calls"
-)
+    Writing bytes directly to sys.stdout.buffer skips the text-layer encoding
+    and per-print locking that add up on large CloudWatch payloads.
+    """
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_dumps_bytes(obj))
+    sys.stdout.buffer.write(b"\n")
+    sys.stdout.buffer.flush()
 
-# Summarize log activity command
-summarize_parser = subparsers.add_parser(
-    "summarize", help="Generate a summary of log activity"
-)
-summarize_parser.add_argument(
-    "log_group_name", help="The name of the log group to analyze"
-)
-summarize_parser.add_argument(
-    "--hours", type=int, default=24, help="Number of hours to look back (default: 24)"
-)
-summarize_parser.add_argument(
-    "--start-time",
-    type=str,
-    help="Start time (ISO8601, e.g. 2024-06-01T00:00:00Z); naive values are treated as UTC",
-)
-summarize_parser.add_argument(
-    "--end-time",
-    type=str,
-    help="End time (ISO8601, e.g. 2024-06-01T23:59:59Z); naive values are treated as UTC",
-)
-summarize_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
-)
-summarize_parser.add_argument("--region", help="AWS region name to use for API calls")
 
-# Find error patterns command
-errors_parser = subparsers.add_parser(
-    "find-errors", help="Find common error patterns in logs"
-)
-errors_parser.add_argument(
-    "log_group_name", help="The name of the log group to analyze"
-)
-errors_parser.add_argument(
-    "--hours", type=int, default=24, help="Number of hours to look back (default: 24)"
-)
-errors_parser.add_argument(
-    "--start-time",
-    type=str,
-    help="Start time (ISO8601, e.g. 2024-06-01T00:00:00Z); naive values are treated as UTC",
-)
-errors_parser.add_argument(
-    "--end-time",
-    type=str,
-    help="End time (ISO8601, e.g. 2024-06-01T23:59:59Z); naive values are treated as UTC",
-)
-errors_parser.add_argument("--profile", help="AWS profile name to use for credentials")
-errors_parser.add_argument("--region", help="AWS region name to use for API calls")
+def _build_list_groups():
+    """Register the `list-groups` subparser."""
+    list_groups_parser = subparsers.add_parser(
+        "list-groups", help="List CloudWatch log groups", parents=[_aws_parent]
+    )
+    list_groups_parser.add_argument("--prefix", help="Filter log groups by name prefix")
+    list_groups_parser.add_argument(
+        "--limit",
+        type=int,
+        default=50,
+        help="Maximum number of log groups to return (default: 50)",
+    )
+    list_groups_parser.add_argument(
+        "--next-token", help="Token for pagination to get the next set of results"
+    )
+    list_groups_parser.add_argument(
+        "--use-tool",
+        action="store_true",
+        help="Use the tool interface instead of resource",
+    )
 
-# Correlate logs command
-correlate_parser = subparsers.add_parser(
-    "correlate", help="Correlate logs across multiple AWS services"
-)
-correlate_parser.add_argument(
-    "log_group_names", nargs="+", help="List of log group names to search"
-)
-correlate_parser.add_argument("search_term", help="Term to search for in logs")
-correlate_parser.add_argument(
-    "--hours", type=int, default=24, help="Number of hours to look back (default: 24)"
-)
-correlate_parser.add_argument(
-    "--start-time",
-    type=str,
-    help="Start time (ISO8601, e.g. 2024-06-01T00:00:00Z); naive values are treated as UTC",
-)
-correlate_parser.add_argument(
-    "--end-time",
-    type=str,
-    help="End time (ISO8601, e.g. 2024-06-01T23:59:59Z); naive values are treated as UTC",
-)
-correlate_parser.add_argument(
-    "--profile", help="AWS profile name to use for credentials"
-)
-correlate_parser.add_argument("--region", help="AWS region name to use for API calls")
+
+def _build_group_details():
+    """Register the `group-details` subparser."""
+    group_details_parser = subparsers.add_parser(
+        "group-details",
+        help="Get detailed information about a log group",
+        parents=[_aws_parent],
+    )
+    group_details_parser.add_argument(
+        "log_group_name", help="The name of the log group"
+    )
+
+
+def _build_list_streams():
+    """Register the `list-streams` subparser."""
+    list_streams_parser = subparsers.add_parser(
+        "list-streams",
+        help="List log streams for a specific log group",
+        parents=[_aws_parent],
+    )
+    list_streams_parser.add_argument("log_group_name", help="The name of the log group")
+
+
+def _build_get_events():
+    """Register the `get-events` subparser."""
+    get_events_parser = subparsers.add_parser(
+        "get-events",
+        help="Get log events from a specific log stream",
+        parents=[_aws_parent],
+    )
+    get_events_parser.add_argument("log_group_name", help="The name of the log group")
+    get_events_parser.add_argument("log_stream_name", help="The name of the log stream")
+
+
+def _build_sample():
+    """Register the `sample` subparser."""
+    sample_parser = subparsers.add_parser(
+        "sample",
+        help="Get a sample of recent logs from a log group",
+        parents=[_aws_parent],
+    )
+    sample_parser.add_argument("log_group_name", help="The name of the log group")
+    sample_parser.add_argument(
+        "--limit", type=int, default=10, help="Number of logs to sample (default: 10)"
+    )
+
+
+def _build_recent_errors():
+    """Register the `recent-errors` subparser."""
+    errors_parser = subparsers.add_parser(
+        "recent-errors",
+        help="Get recent error logs from a log group",
+        parents=[_aws_parent],
+    )
+    errors_parser.add_argument(
+        "log_group_name", help="The name of the log group to analyze"
+    )
+    errors_parser.add_argument(
+        "--hours",
+        type=int,
+        default=24,
+        help="Number of hours to look back (default: 24)",
+    )
+
+
+def _build_metrics():
+    """Register the `metrics` subparser."""
+    metrics_parser = subparsers.add_parser(
+        "metrics", help="Get log volume metrics for a log group", parents=[_aws_parent]
+    )
+    metrics_parser.add_argument(
+        "log_group_name", help="The name of the log group to analyze"
+    )
+    metrics_parser.add_argument(
+        "--hours",
+        type=int,
+        default=24,
+        help="Number of hours to look back (default: 24)",
+    )
+
+
+def _build_structure():
+    """Register the `structure` subparser."""
+    structure_parser = subparsers.add_parser(
+        "structure",
+        help="Analyze the structure of logs in a log group",
+        parents=[_aws_parent],
+    )
+    structure_parser.add_argument(
+        "log_group_name", help="The name of the log group to analyze"
+    )
+
+
+def _build_get_prompt():
+    """Register the `get-prompt` subparser."""
+    prompt_parser = subparsers.add_parser(
+        "get-prompt",
+        help="Get a prompt for analyzing CloudWatch logs",
+        parents=[_aws_parent],
+    )
+    prompt_parser.add_argument(
+        "log_group_name", help="The name of the log group to analyze"
+    )
+
+
+def _build_list_prompt():
+    """Register the `list-prompt` subparser."""
+    list_prompt_parser = subparsers.add_parser(
+        "list-prompt",
+        help="Get a prompt for listing CloudWatch log groups",
+        parents=[_aws_parent],
+    )
+    list_prompt_parser.add_argument(
+        "--prefix", help="Optional prefix to filter log groups by name"
+    )
+
+
+def _build_search():
+    """Register the `search` subparser."""
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Search for patterns in CloudWatch logs",
+        parents=[_aws_parent, _time_window_parent],
+    )
+    search_parser.add_argument(
+        "log_group_name", help="The name of the log group to search"
+    )
+    search_parser.add_argument(
+        "query", help="The search query (CloudWatch Logs Insights syntax)"
+    )
+
+
+def _build_search_multi():
+    """Register the `search-multi` subparser."""
+    search_multi_parser = subparsers.add_parser(
+        "search-multi",
+        help="Search for patterns across multiple CloudWatch log groups",
+        parents=[_aws_parent, _time_window_parent],
+    )
+    search_multi_parser.add_argument(
+        "log_group_names", nargs="+", help="List of log group names to search"
+    )
+    search_multi_parser.add_argument(
+        "query", help="The search query (CloudWatch Logs Insights syntax)"
+    )
+
+
+def _build_summarize():
+    """Register the `summarize` subparser."""
+    summarize_parser = subparsers.add_parser(
+        "summarize",
+        help="Generate a summary of log activity",
+        parents=[_aws_parent, _time_window_parent],
+    )
+    summarize_parser.add_argument(
+        "log_group_name", help="The name of the log group to analyze"
+    )
+
+
+def _build_find_errors():
+    """Register the `find-errors` subparser."""
+    errors_parser = subparsers.add_parser(
+        "find-errors",
+        help="Find common error patterns in logs",
+        parents=[_aws_parent, _time_window_parent],
+    )
+    errors_parser.add_argument(
+        "log_group_name", help="The name of the log group to analyze"
+    )
+
+
+def _build_repl():
+    """Register the `repl` subparser."""
+    repl_parser = subparsers.add_parser(
+        "repl",
+        help="Read commands from stdin and run them over one persistent server session",
+        parents=[_aws_parent],
+    )
+    repl_parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run the JSON list of commands in FILE instead of reading stdin",
+    )
+
+
+def _build_batch():
+    """Register the `batch` subparser."""
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Run a JSON list of tool operations in one server round trip",
+        parents=[_aws_parent],
+    )
+    batch_parser.add_argument(
+        "spec", help='JSON file with a list of {"name": ..., "args": {...}} operations'
+    )
+    batch_parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=8,
+        help="Maximum operations the server runs at once (default: 8)",
+    )
+
+
+def _build_correlate():
+    """Register the `correlate` subparser."""
+    correlate_parser = subparsers.add_parser(
+        "correlate",
+        help="Correlate logs across multiple AWS services",
+        parents=[_aws_parent, _time_window_parent],
+    )
+    correlate_parser.add_argument(
+        "log_group_names", nargs="+", help="List of log group names to search"
+    )
+    correlate_parser.add_argument("search_term", help="Term to search for in logs")
+    correlate_parser.add_argument(
+        "--fanout",
+        choices=["tool", "resource"],
+        default="tool",
+        help="Correlate via the tool interface (default) or concurrent "
+        "recent-errors resource reads (always the resource's 24-hour window; "
+        "--hours is ignored)",
+    )
+    correlate_parser.add_argument(
+        "--parallel",
+        type=int,
+        default=FANOUT_LIMIT,
+        help="Maximum concurrent resource reads with --fanout resource "
+        f"(default: {FANOUT_LIMIT})",
+    )
+
+
+# Map each command name to the function that registers its subparser. Building
+# all of them up front is wasted work for a single-command invocation, so
+# _register_subparsers() only builds the one named on the command line.
+BUILDERS = {
+    "list-groups": _build_list_groups,
+    "group-details": _build_group_details,
+    "list-streams": _build_list_streams,
+    "get-events": _build_get_events,
+    "sample": _build_sample,
+    "recent-errors": _build_recent_errors,
+    "metrics": _build_metrics,
+    "structure": _build_structure,
+    "get-prompt": _build_get_prompt,
+    "list-prompt": _build_list_prompt,
+    "search": _build_search,
+    "search-multi": _build_search_multi,
+    "summarize": _build_summarize,
+    "find-errors": _build_find_errors,
+    "correlate": _build_correlate,
+    "batch": _build_batch,
+    "repl": _build_repl,
+}
+
+
+def _register_subparsers(argv):
+    """Build only the subparser needed for this invocation.
+
+    Scans argv for the first non-flag token; if it names a known command, only
+    that subparser is built before parsing. For the help/no-command case (or an
+    unrecognized token) every subparser is built so argparse can report the
+    full command list.
+    """
+    command = next((token for token in argv if not token.startswith("-")), None)
+    if command in BUILDERS:
+        if command not in subparsers.choices:
+            BUILDERS[command]()
+    else:
+        for name, build in BUILDERS.items():
+            if name not in subparsers.choices:
+                build()
+
+
+def _autocomplete(argv):
+    """Wire up shell completion via argcomplete, if it is installed.
+
+    Only the subparser for the command being completed is built (from
+    COMP_LINE, since argcomplete re-executes the script with an empty argv),
+    so completion latency stays flat as commands are added. argcomplete
+    handles the completion request and exits the process; when it is not
+    installed this is a no-op.
+    """
+    try:
+        import argcomplete
+    except ImportError:
+        return
+    _register_subparsers(argv)
+    argcomplete.autocomplete(parser, always_complete_options=False)
+
+
+@functools.lru_cache(maxsize=None)
+def _aws_config_kwargs(profile, region):
+    """Build the profile/region kwargs dict once per (profile, region) pair."""
+    aws_kwargs = {}
+    if profile:
+        aws_kwargs["profile"] = profile
+    if region:
+        aws_kwargs["region"] = region
+    return aws_kwargs
 
 
 def add_aws_config_args(tool_args, args):
     """Add profile and region arguments to tool calls if specified."""
-    if args.profile:
-        tool_args["profile"] = args.profile
-    if args.region:
-        tool_args["region"] = args.region
+    # Common case: neither is set (env vars / IAM role supply credentials and
+    # the server spawn already carried any top-level overrides) — skip the
+    # per-call dict mutation entirely
+    if not (args.profile or args.region):
+        return tool_args
+    # C-implemented dict.update with a cached dict instead of re-running the
+    # per-key conditionals on every call
+    tool_args.update(_aws_config_kwargs(args.profile, args.region))
     return tool_args
 
 
-async def main():
-    """Main function to run the CloudWatch Logs MCP client."""
+@dataclass(frozen=True)
+class CommandSpec:
+    """Declarative description of how a CLI command maps onto the MCP API.
+
+    Attributes:
+        kind: "tool", "resource", or "prompt"
+        name: Tool or prompt name to invoke (tool/prompt kinds)
+        uri_template: Resource URI path template, formatted with parsed args
+            (resource kind)
+        query_fields: argparse attribute names appended as a urlencoded query
+            string (resource kind)
+        fields: argparse attribute names forwarded as call arguments
+        time_window: Whether the command accepts --hours/--start-time/--end-time
+    """
+
+    kind: str
+    name: str = None
+    uri_template: str = None
+    query_fields: tuple = ()
+    fields: tuple = ()
+    time_window: bool = False
+
+
+# Dispatch table for main(); "list-groups" is handled separately because it
+# switches between the tool and resource interfaces at runtime.
+COMMANDS = {
+    "group-details": CommandSpec(
+        kind="resource", uri_template="logs://groups/{log_group_name}"
+    ),
+    "list-streams": CommandSpec(
+        kind="resource", uri_template="logs://groups/{log_group_name}/streams"
+    ),
+    "get-events": CommandSpec(
+        kind="resource",
+        uri_template="logs://groups/{log_group_name}/streams/{log_stream_name}",
+    ),
+    "sample": CommandSpec(
+        kind="resource",
+        uri_template="logs://groups/{log_group_name}/sample",
+        query_fields=("limit",),
+    ),
+    "recent-errors": CommandSpec(
+        kind="resource",
+        uri_template="logs://groups/{log_group_name}/recent-errors",
+        query_fields=("hours",),
+    ),
+    "metrics": CommandSpec(
+        kind="resource",
+        uri_template="logs://groups/{log_group_name}/metrics",
+        query_fields=("hours",),
+    ),
+    "structure": CommandSpec(
+        kind="resource", uri_template="logs://groups/{log_group_name}/structure"
+    ),
+    "get-prompt": CommandSpec(
+        kind="prompt", name="analyze_cloudwatch_logs", fields=("log_group_name",)
+    ),
+    "list-prompt": CommandSpec(
+        kind="prompt", name="list_cloudwatch_log_groups", fields=("prefix",)
+    ),
+    "search": CommandSpec(
+        kind="tool",
+        name="search_logs",
+        fields=("log_group_name", "query"),
+        time_window=True,
+    ),
+    "search-multi": CommandSpec(
+        kind="tool",
+        name="search_logs_multi",
+        fields=("log_group_names", "query"),
+        time_window=True,
+    ),
+    "summarize": CommandSpec(
+        kind="tool",
+        name="summarize_log_activity",
+        fields=("log_group_name",),
+        time_window=True,
+    ),
+    "find-errors": CommandSpec(
+        kind="tool",
+        name="find_error_patterns",
+        fields=("log_group_name",),
+        time_window=True,
+    ),
+    "correlate": CommandSpec(
+        kind="tool",
+        name="correlate_logs",
+        fields=("log_group_names", "search_term"),
+        time_window=True,
+    ),
+}
+
+
+def _print_prompt_result(result):
+    """Extract and print the prompt text from a get_prompt result."""
+    prompt_messages = result.messages
+    if prompt_messages and len(prompt_messages) > 0:
+        message = prompt_messages[0]
+        # One getattr chain instead of two hasattr probes (each hasattr is a
+        # getattr plus a swallowed AttributeError)
+        text = getattr(getattr(message, "content", None), "text", None)
+        if text is not None:
+            print(text)
+        else:
+            print(json.dumps(message, default=lambda x: x.__dict__, indent=2))
+    else:
+        print("No prompt received.")
+
+
+async def _run_list_groups(session, args):
+    """Execute the `list-groups` command via the tool or resource interface."""
+    if args.use_tool:
+        # Use the tool interface
+        tool_args = {}
+        if args.prefix:
+            tool_args["prefix"] = args.prefix
+        if args.limit:
+            tool_args["limit"] = args.limit
+        if args.next_token:
+            tool_args["next_token"] = args.next_token
+        tool_args = add_aws_config_args(tool_args, args)
+
+        result = await session.call_tool("list_log_groups", arguments=tool_args)
+        print_json_response(result)
+    else:
+        # Use the resource interface; if a prefix is provided, use the
+        # filtered endpoint
+        if args.prefix:
+            resource_uri = f"logs://groups/filter/{quote(args.prefix, safe='')}"
+        else:
+            resource_uri = "logs://groups"
+
+        content, _ = await session.read_resource(resource_uri)
+        print_json_response(content)
+
+
+def _call_arguments(args, spec):
+    """Build the tool/prompt call arguments described by a CommandSpec."""
+    # Build the call arguments from the declared fields, skipping unset ones
+    arguments = {
+        field: getattr(args, field)
+        for field in spec.fields
+        if getattr(args, field, None) is not None
+    }
+    if spec.time_window:
+        if args.start_time:
+            arguments["start_time"] = args.start_time
+        if args.end_time:
+            arguments["end_time"] = args.end_time
+        if not (args.start_time or args.end_time):
+            arguments["hours"] = args.hours
+    return add_aws_config_args(arguments, args)
+
+
+def _result_text(result):
+    """Extract the text payload from a CallToolResult."""
+    content = getattr(result, "content", result)
+    if isinstance(content, list):
+        for item in content:
+            text = getattr(item, "text", None)
+            if text:
+                return text
+        return None
+    return getattr(content, "text", content if isinstance(content, str) else None)
+
+
+async def _run_search_multi_chunked(session, args):
+    """Split an oversized search-multi across concurrent StartQuery batches.
+
+    StartQuery caps logGroupNames at INSIGHTS_MAX_LOG_GROUPS, so beyond that
+    the groups are split into max-sized chunks queried concurrently with
+    asyncio.gather; each chunk still rides a single native multi-group query,
+    and the per-chunk payloads are merged back into one search_logs_multi
+    shape.
+    """
+    arguments = _call_arguments(args, COMMANDS[args.command])
+    groups = arguments.pop("log_group_names")
+    chunks = [
+        groups[i : i + INSIGHTS_MAX_LOG_GROUPS]
+        for i in range(0, len(groups), INSIGHTS_MAX_LOG_GROUPS)
+    ]
+
+    results = await asyncio.gather(
+        *(
+            session.call_tool(
+                "search_logs_multi", arguments={**arguments, "log_group_names": chunk}
+            )
+            for chunk in chunks
+        )
+    )
+    merged = _merge_search_payloads(groups, _parse_payloads(results))
+    print_json_response(merged)
+
+
+def _parse_payloads(results):
+    """Decode a batch of CallToolResults into payload dicts, keeping failures."""
+    payloads = []
+    for result in results:
+        text = _result_text(result)
+        try:
+            payloads.append(json.loads(text))
+        except (TypeError, ValueError):
+            payloads.append({"status": "Error", "error": str(text)})
+    return payloads
+
+
+def _merge_search_payloads(groups, payloads):
+    """Merge per-group search_logs payloads into one search_logs_multi shape."""
+    statuses = {payload.get("status", "Error") for payload in payloads}
+    merged_results = []
+    for payload in payloads:
+        merged_results.extend(payload.get("results", []))
+    merged_results.sort(key=lambda r: r.get("@timestamp", ""))
+
+    merged = {
+        "status": "Complete"
+        if statuses == {"Complete"}
+        else ", ".join(sorted(statuses)),
+        "searchedLogGroups": list(groups),
+        "results": merged_results,
+    }
+    return merged
+
+
+async def _run_resource_fanout(session, args):
+    """Read each group's recent-errors resource concurrently, keyed by group.
+
+    Resource reads skip the Logs Insights query path entirely, so fetching
+    them in parallel (capped by FANOUT_LIMIT) overlaps the per-group
+    CloudWatch latency. Failures are reported per group rather than aborting
+    the whole command.
+
+    The URI must stay bare: FastMCP matches resource templates with a
+    fullmatch against the template path, so a query string never routes.
+    Resource mode therefore always covers the resource's fixed 24-hour
+    window; --hours only applies to the default tool mode.
+    """
+    semaphore = asyncio.Semaphore(getattr(args, "parallel", FANOUT_LIMIT))
+
+    async def read_one(group):
+        async with semaphore:
+            content, _ = await session.read_resource(
+                f"logs://groups/{quote(group, safe='')}/recent-errors"
+            )
+            return content
+
+    results = await asyncio.gather(
+        *(read_one(group) for group in args.log_group_names),
+        return_exceptions=True,
+    )
+
+    merged = {}
+    for group, content in zip(args.log_group_names, results):
+        if isinstance(content, Exception):
+            merged[group] = {"status": "Error", "error": str(content)}
+            continue
+        text = _result_text(content)
+        try:
+            merged[group] = json.loads(text)
+        except (TypeError, ValueError):
+            merged[group] = str(text if text is not None else content)
+    print_json_response(merged)
+
+
+def _uri_fields(args):
+    """Return parsed args as a dict with URI path fields percent-encoded.
+
+    Log group names routinely contain '/' (e.g. /aws/lambda/fn); encoding
+    them keeps each name a single path segment instead of silently changing
+    the resource route.
+    """
+    values = dict(vars(args))
+    for key in ("log_group_name", "log_stream_name", "prefix"):
+        value = values.get(key)
+        if isinstance(value, str):
+            values[key] = quote(value, safe="")
+    return values
+
+
+async def _read_resource_cmd(session, resource_uri):
+    """Read one resource URI and print its payload."""
+    content, _ = await session.read_resource(resource_uri)
+    print_json_response(content)
+
+
+async def _call_cmd(session, spec, arguments):
+    """Invoke one tool or prompt with prepared arguments and print the result."""
+    if spec.kind == "tool":
+        result = await session.call_tool(spec.name, arguments=arguments)
+        print_json_response(result)
+    else:
+        result = await session.get_prompt(spec.name, arguments=arguments)
+        _print_prompt_result(result)
+
+
+def _prepare_invocation(args):
+    """Resolve args.command into a ready-to-run coroutine function.
+
+    All local preparation (command lookup, URI interpolation, argument dict
+    assembly) happens here, without touching the session, so callers can do
+    this work while the MCP initialize round-trip is still in flight. The
+    returned callable takes the initialized session and performs the call.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        An async callable of one argument (the session)
+    """
+    if args.command == "repl":
+        return lambda session: _run_repl(session, args)
+    if args.command == "list-groups":
+        return lambda session: _run_list_groups(session, args)
+    if args.command == "batch":
+        with open(args.spec) as f:
+            operations = json.load(f)
+        # profile/region overrides belong inside each operation's args;
+        # batch_execute itself takes none
+        arguments = {"operations": operations, "max_concurrent": args.max_concurrent}
+        return lambda session: _call_cmd(
+            session, CommandSpec(kind="tool", name="batch_execute"), arguments
+        )
+    if args.command == "correlate" and args.fanout == "resource":
+        return lambda session: _run_resource_fanout(session, args)
+    # Multi-group correlate rides the server's single batched Insights query
+    # (it chunks past 50 groups itself), so no client-side fan-out is needed
+    if (
+        args.command == "search-multi"
+        and len(args.log_group_names) > INSIGHTS_MAX_LOG_GROUPS
+    ):
+        return lambda session: _run_search_multi_chunked(session, args)
+
+    spec = COMMANDS[args.command]
+    if spec.kind == "resource":
+        resource_uri = spec.uri_template.format_map(_uri_fields(args))
+        if spec.query_fields:
+            resource_uri += "?" + urlencode(
+                {field: getattr(args, field) for field in spec.query_fields}
+            )
+        return lambda session: _read_resource_cmd(session, resource_uri)
+
+    arguments = _call_arguments(args, spec)
+    return lambda session: _call_cmd(session, spec, arguments)
+
+
+def main():
+    """Parse arguments and run the CloudWatch Logs MCP client."""
+    global _raw_output
+    if "_ARGCOMPLETE" in os.environ:
+        # The words being completed arrive via COMP_LINE, not sys.argv
+        _autocomplete(os.environ.get("COMP_LINE", "").split()[1:])
+    _register_subparsers(sys.argv[1:])
     args = parser.parse_args()
+    _raw_output = args.raw or not sys.stdout.isatty()
+
+    # Bail out before importing mcp or starting an event loop when there is
+    # nothing to run; this keeps the help/no-command path fast.
+    if args.command is None:
+        parser.print_help()
+        return
+
+    # Use uvloop's libuv event loop when it is installed; the stdio framing
+    # to the server subprocess benefits from its lower pipe-I/O overhead.
+    # Not available on Windows, so degrade silently.
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
+    asyncio.run(run_command(args))
+
+
+def _load_inprocess_server(args):
+    """Import the MCP server into this process, honoring --profile/--region.
+
+    Running the FastMCP instance over mcp's in-memory transport skips the
+    server subprocess spawn and its interpreter boot plus boto3/mcp import
+    cost — typically the single largest share of a one-shot CLI call. The
+    server module parses its own argv at import time, so sys.argv is swapped
+    for the server's flags around the import. Returns None when the package
+    is not importable (e.g. the client script was copied out of the tree),
+    in which case the stdio subprocess path is used instead.
+    """
+    server_argv = [SERVER_PATH]
+    if args.profile:
+        server_argv.extend(["--profile", args.profile])
+    if args.region:
+        server_argv.extend(["--region", args.region])
+    original_argv = sys.argv
+    sys.argv = server_argv
+    try:
+        from cw_mcp_server import server as server_module
+    except ImportError:
+        return None
+    finally:
+        sys.argv = original_argv
+    return server_module.mcp
+
 
-    # Determine the server path (relative or absolute)
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    server_path = os.path.join(script_dir, "cw_mcp_server", "server.py")
+async def run_command(args):
+    """Connect to the MCP server and execute the requested command."""
+    server = _load_inprocess_server(args)
+    if server is not None:
+        # In-process path: the memory transport runs the handshake before
+        # yielding the session, so no initialize overlap is needed. The
+        # helper (and its acceptance of a FastMCP instance) is newer than
+        # the mcp floor in pyproject.toml, so an older resolved SDK falls
+        # back to the stdio subprocess path instead of crashing.
+        try:
+            from mcp.shared.memory import create_connected_server_and_client_session
+        except ImportError:
+            server = None
+
+    if server is not None:
+        ran = False
+        failed = False
+        try:
+            async with create_connected_server_and_client_session(server) as session:
+                ran = True
+                try:
+                    await _prepare_invocation(args)(session)
+                except Exception as e:
+                    print(f"Error: {str(e)}", file=sys.stderr)
+                    failed = True
+        except Exception:
+            # Session setup failed before the command ran — an SDK without
+            # in-process FastMCP support. Fall through to the stdio path.
+            # Failures after the command ran are real and must not trigger
+            # a second execution over stdio.
+            if ran:
+                raise
+        else:
+            # Exit outside the context manager: raising SystemExit inside
+            # the transport's task group would surface as an exception group
+            if failed:
+                sys.exit(1)
+            return
+
+    # Import mcp lazily so argument parsing and help output don't pay for it
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
 
     # Prepare server arguments
-    server_args = [server_path]
+    server_args = [SERVER_PATH]
     if args.profile:
         server_args.extend(["--profile", args.profile])
     if args.region:
         server_args.extend(["--region", args.region])
 
-    # Create server parameters
-    server_params = StdioServerParameters(command="python3", args=server_args, env=None)
+    # Create server parameters; sys.executable skips the PATH lookup and any
+    # pyenv/conda shim layer, and guarantees the server sees the same
+    # interpreter and site-packages as the client
+    server_params = StdioServerParameters(
+        command=sys.executable, args=server_args, env=None
+    )
 
     # Connect to the server
     async with stdio_client(server_params) as (read, write):
         async with ClientSession(read, write) as session:
-            # Initialize the client session
-            await session.initialize()
-
-            # Check if a command was specified
-            if args.command is None:
-                parser.print_help()
-                return
+            # Kick off the initialize handshake and overlap it with the local
+            # CPU-bound command preparation (URI interpolation, argument
+            # dict assembly); the TaskGroup awaits the handshake on exit.
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(session.initialize())
+                run = _prepare_invocation(args)
 
             try:
                 # Execute the requested command
-                if args.command == "list-groups":
-                    if args.use_tool:
-                        # Use the tool interface
-                        tool_args = {}
-                        if args.prefix:
-                            tool_args["prefix"] = args.prefix
-                        if args.limit:
-                            tool_args["limit"] = args.limit
-                        if args.next_token:
-                            tool_args["next_token"] = args.next_token
-                        tool_args = add_aws_config_args(tool_args, args)
-
-                        result = await session.call_tool(
-                            "list_log_groups", arguments=tool_args
-                        )
-                        print_json_response(result)
-                    else:
-                        # Use the resource interface
-                        # Build query string for parameters if provided
-                        if args.prefix:
-                            # If prefix is provided, use the filtered endpoint
-                            resource_uri = f"logs://groups/filter/{args.prefix}"
-                        else:
-                            resource_uri = "logs://groups"
-
-                        content, _ = await session.read_resource(resource_uri)
-                        print_json_response(content)
-
-                elif args.command == "group-details":
-                    resource_uri = f"logs://groups/{args.log_group_name}"
-                    content, _ = await session.read_resource(resource_uri)
-                    print_json_response(content)
-
-                elif args.command == "list-streams":
-                    resource_uri = f"logs://groups/{args.log_group_name}/streams"
-                    content, _ = await session.read_resource(resource_uri)
-                    print_json_response(content)
-
-                elif args.command == "get-events":
-                    resource_uri = f"logs://groups/{args.log_group_name}/streams/{args.log_stream_name}"
-                    content, _ = await session.read_resource(resource_uri)
-                    print_json_response(content)
-
-                elif args.command == "sample":
-                    resource_uri = (
-                        f"logs://groups/{args.log_group_name}/sample?limit={args.limit}"
-                    )
-                    content, _ = await session.read_resource(resource_uri)
-                    print_json_response(content)
-
-                elif args.command == "recent-errors":
-                    resource_uri = f"logs://groups/{args.log_group_name}/recent-errors?hours={args.hours}"
-                    content, _ = await session.read_resource(resource_uri)
-                    print_json_response(content)
-
-                elif args.command == "metrics":
-                    resource_uri = f"logs://groups/{args.log_group_name}/metrics?hours={args.hours}"
-                    content, _ = await session.read_resource(resource_uri)
-                    print_json_response(content)
-
-                elif args.command == "structure":
-                    resource_uri = f"logs://groups/{args.log_group_name}/structure"
-                    content, _ = await session.read_resource(resource_uri)
-                    print_json_response(content)
-
-                elif args.command == "get-prompt":
-                    # Get the analyze logs prompt from the server
-                    arguments = {"log_group_name": args.log_group_name}
-                    arguments = add_aws_config_args(arguments, args)
-                    result = await session.get_prompt(
-                        "analyze_cloudwatch_logs",
-                        arguments=arguments,
-                    )
-
-                    # Extract and print the prompt text
-                    prompt_messages = result.messages
-                    if prompt_messages and len(prompt_messages) > 0:
-                        message = prompt_messages[0]
-                        if hasattr(message, "content") and hasattr(
-                            message.content, "text"
-                        ):
-                            print(message.content.text)
-                        else:
-                            print(
-                                json.dumps(
-                                    message, default=lambda x: x.__dict__, indent=2
-                                )
-                            )
-                    else:
-                        print("No prompt received.")
-
-                elif args.command == "list-prompt":
-                    # Get arguments for the prompt
-                    arguments = {}
-                    if args.prefix:
-                        arguments["prefix"] = args.prefix
-                    arguments = add_aws_config_args(arguments, args)
-
-                    # Get the list logs prompt from the server
-                    result = await session.get_prompt(
-                        "list_cloudwatch_log_groups", arguments=arguments
-                    )
-
-                    # Extract and print the prompt text
-                    prompt_messages = result.messages
-                    if prompt_messages and len(prompt_messages) > 0:
-                        message = prompt_messages[0]
-                        if hasattr(message, "content") and hasattr(
-                            message.content, "text"
-                        ):
-                            print(message.content.text)
-                        else:
-                            print(
-                                json.dumps(
-                                    message, default=lambda x: x.__dict__, indent=2
-                                )
-                            )
-                    else:
-                        print("No prompt received.")
-
-                elif args.command == "search":
-                    tool_args = {
-                        "log_group_name": args.log_group_name,
-                        "query": args.query,
-                    }
-                    if args.start_time:
-                        tool_args["start_time"] = args.start_time
-                    if args.end_time:
-                        tool_args["end_time"] = args.end_time
-                    if not (args.start_time or args.end_time):
-                        tool_args["hours"] = args.hours
-                    tool_args = add_aws_config_args(tool_args, args)
-                    result = await session.call_tool(
-                        "search_logs",
-                        arguments=tool_args,
-                    )
-                    print_json_response(result)
-
-                elif args.command == "search-multi":
-                    tool_args = {
-                        "log_group_names": args.log_group_names,
-                        "query": args.query,
-                    }
-                    if args.start_time:
-                        tool_args["start_time"] = args.start_time
-                    if args.end_time:
-                        tool_args["end_time"] = args.end_time
-                    if not (args.start_time or args.end_time):
-                        tool_args["hours"] = args.hours
-                    tool_args = add_aws_config_args(tool_args, args)
-                    result = await session.call_tool(
-                        "search_logs_multi",
-                        arguments=tool_args,
-                    )
-                    print_json_response(result)
-
-                elif args.command == "summarize":
-                    tool_args = {
-                        "log_group_name": args.log_group_name,
-                    }
-                    if args.start_time:
-                        tool_args["start_time"] = args.start_time
-                    if args.end_time:
-                        tool_args["end_time"] = args.end_time
-                    if not (args.start_time or args.end_time):
-                        tool_args["hours"] = args.hours
-                    tool_args = add_aws_config_args(tool_args, args)
-                    result = await session.call_tool(
-                        "summarize_log_activity",
-                        arguments=tool_args,
-                    )
-                    print_json_response(result)
-
-                elif args.command == "find-errors":
-                    tool_args = {
-                        "log_group_name": args.log_group_name,
-                    }
-                    if args.start_time:
-                        tool_args["start_time"] = args.start_time
-                    if args.end_time:
-                        tool_args["end_time"] = args.end_time
-                    if not (args.start_time or args.end_time):
-                        tool_args["hours"] = args.hours
-                    tool_args = add_aws_config_args(tool_args, args)
-                    result = await session.call_tool(
-                        "find_error_patterns",
-                        arguments=tool_args,
-                    )
-                    print_json_response(result)
-
-                elif args.command == "correlate":
-                    tool_args = {
-                        "log_group_names": args.log_group_names,
-                        "search_term": args.search_term,
-                    }
-                    if args.start_time:
-                        tool_args["start_time"] = args.start_time
-                    if args.end_time:
-                        tool_args["end_time"] = args.end_time
-                    if not (args.start_time or args.end_time):
-                        tool_args["hours"] = args.hours
-                    tool_args = add_aws_config_args(tool_args, args)
-                    result = await session.call_tool(
-                        "correlate_logs",
-                        arguments=tool_args,
-                    )
-                    print_json_response(result)
-
+                await run(session)
             except Exception as e:
                 print(f"Error: {str(e)}", file=sys.stderr)
                 sys.exit(1)
 
 
+async def _execute(session, args):
+    """Route one parsed command to the appropriate handler."""
+    await _prepare_invocation(args)(session)
+
+
+async def _run_line(session, argv):
+    """Parse one repl/batch command line and execute it against the session."""
+    try:
+        sub_args = parser.parse_args(argv)
+    except SystemExit:
+        # argparse already reported the problem; keep the session alive
+        return
+    if sub_args.command is None or sub_args.command == "repl":
+        return
+    try:
+        await _execute(session, sub_args)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+
+
+async def _run_repl(session, args=None):
+    """Execute commands read from stdin (or a batch file) over one session.
+
+    Each input line is parsed like a client.py command line (without the
+    program name), so scripted batch usage pays the server subprocess spawn
+    and MCP handshake once instead of once per command. An empty line is
+    skipped; EOF or `exit`/`quit` ends the loop. With --batch, the JSON file
+    supplies the command lines (strings, or pre-split argv lists) and stdin
+    is not read.
+    """
+    # Any command can arrive on stdin, so make sure every subparser exists
+    _register_subparsers([])
+
+    batch_file = getattr(args, "batch", None)
+    if batch_file:
+        with open(batch_file) as f:
+            commands = json.load(f)
+        for entry in commands:
+            argv = entry if isinstance(entry, list) else shlex.split(entry)
+            if argv:
+                await _run_line(session, argv)
+        return
+
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        argv = shlex.split(line)
+        if not argv:
+            continue
+        if argv[0] in ("exit", "quit"):
+            break
+        await _run_line(session, argv)
+
+
 def print_json_response(content: str | tuple | object | None):
     """Print JSON content in a formatted way.
 
@@ -541,73 +998,90 @@ def print_json_response(content: str | tuple | object | None):
             - None
     """
     try:
-        # Handle None case
-        if content is None:
-            print("No content received.")
-            return
-
-        # For Session.read_resource responses, which returns tuple (meta, content)
-        # but we found that sometimes content is None
-        if isinstance(content, tuple):
-            meta, content_text = (
-                content
-                if len(content) >= 2
-                else (content[0] if len(content) == 1 else None, None)
-            )
-
-            # If we have usable content in the second element, use it
-            if content_text is not None:
-                content = content_text
-            # Otherwise, if meta looks usable, try that
-            elif isinstance(meta, str) and meta != "meta":
-                content = meta
-            # We don't have usable content in the tuple
-            else:
-                print("No usable content found in the response.")
-                return
-
-        # Handle object with content attribute (from CallToolResult)
-        if hasattr(content, "content"):
-            content = content.content
-
-        # Handle object with text attribute
-        if hasattr(content, "text"):
-            content = content.text
-
-        # Handle CallToolResult content from mcp_types which can be a list
-        if isinstance(content, list) and all(hasattr(item, "text") for item in content):
-            # Extract text from each item
-            extracted_texts = [item.text for item in content if item.text]
-            if extracted_texts:
-                content = extracted_texts[0]  # Use the first text element
-
-        # Handle if content is a custom object with __str__ method
-        if not isinstance(content, (str, bytes, bytearray)) and hasattr(
-            content, "__str__"
-        ):
-            content = str(content)
-
-        # Try to handle various formats
-        if isinstance(content, str):
-            try:
-                # Try to parse as JSON
-                parsed = json.loads(content)
-                print(json.dumps(parsed, indent=2))
-            except json.JSONDecodeError:
-                # Not valid JSON, just print the string
-                print(content)
-        elif isinstance(content, (dict, list)):
-            # Direct Python objects
-            print(json.dumps(content, indent=2, default=lambda x: str(x)))
-        else:
-            # Fall back to string representation
-            print(content)
-
+        _emit(content)
     except Exception as e:
         # Catch-all for any unexpected errors
         print(f"Error processing response: {e}")
         print(content)
 
 
+@functools.singledispatch
+def _emit(content):
+    """Print one response payload, dispatching on its concrete type.
+
+    The generic fallback unwraps CallToolResult-style objects that carry a
+    .content or .text attribute, then falls back to the string representation.
+    """
+    inner = getattr(content, "content", None)
+    if inner is not None:
+        _emit(inner)
+        return
+    text = getattr(content, "text", None)
+    if text is not None:
+        _emit(text)
+        return
+    _emit(str(content))
+
+
+@_emit.register(type(None))
+def _emit_none(content):
+    print("No content received.")
+
+
+@_emit.register(tuple)
+def _emit_tuple(content):
+    # Session.read_resource returns a (meta, content) tuple, but sometimes the
+    # content element is None
+    meta, content_text = (
+        content
+        if len(content) >= 2
+        else (content[0] if len(content) == 1 else None, None)
+    )
+
+    # If we have usable content in the second element, use it
+    if content_text is not None:
+        _emit(content_text)
+    # Otherwise, if meta looks usable, try that
+    elif isinstance(meta, str) and meta != "meta":
+        _emit(meta)
+    # We don't have usable content in the tuple
+    else:
+        print("No usable content found in the response.")
+
+
+@_emit.register(str)
+def _emit_str(content):
+    # Server payloads are already json.dumps(..., indent=2) formatted; detect
+    # that shape and pass it straight through instead of paying for a parse
+    # plus re-serialize round trip. --raw skips re-formatting unconditionally.
+    if _raw_output or content.lstrip()[:3] in ("{\n ", "[\n "):
+        print(content)
+        return
+    try:
+        # Try to parse as JSON
+        parsed = _loads(content)
+    except ValueError:
+        # Not valid JSON, just print the string
+        print(content)
+    else:
+        _write_json(parsed)
+
+
+@_emit.register(list)
+def _emit_list(content):
+    # CallToolResult content from mcp_types can be a list of text items
+    if content and all(hasattr(item, "text") for item in content):
+        extracted_texts = [item.text for item in content if item.text]
+        if extracted_texts:
+            _emit(extracted_texts[0])  # Use the first text element
+            return
+    _write_json(content)
+
+
+@_emit.register(dict)
+def _emit_dict(content):
+    _write_json(content)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -5,10 +5,48 @@
 
 import boto3
 import json
+from botocore.config import Config
 from datetime import datetime, timedelta
 from typing import Dict, List
 import re
+import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Resolve the JSON codec once at import: orjson's Rust encoder/parser when it
+# is installed, stdlib json otherwise. Every response in this file funnels
+# through _dumps, so the swap covers the whole serialization hot path.
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode()
+
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2, default=str)
+
+    _loads = json.loads
+
+# Shared client settings: a larger HTTP connection pool so concurrent
+# requests reuse connections instead of handshaking, and adaptive retries
+# that back off under CloudWatch throttling
+_CLIENT_CONFIG = Config(max_pool_connections=50, retries={"mode": "adaptive"})
+
+# Patterns for log-structure analysis, compiled once per process; the
+# per-event loops then run straight into the C regex engine. Log level and
+# the timestamp shapes (ISO with T or space separator, MM/DD/YYYY) share one
+# alternation so a single scan classifies both instead of up to four
+# separate re.search entries per message.
+_CLASSIFY_RE = re.compile(
+    r"(?P<lvl>\b(?:DEBUG|INFO|WARN|WARNING|ERROR|FATAL|CRITICAL)\b)"
+    r"|(?P<iso>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2})"
+    r"|(?P<usd>\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})"
+)
+_KV_PRESENT_RE = re.compile(r"\w+=[\'\"][^\'\"]*[\'\"]|\w+=\S+")
+_KV_FIELD_RE = re.compile(r"(\w+)=[\'\"]?([^\'\"\s]*)[\'\"]?")
 
 
 class CloudWatchLogsResource:
@@ -25,9 +63,27 @@ class CloudWatchLogsResource:
         self.profile_name = profile_name
         self.region_name = region_name
 
-        # Initialize boto3 CloudWatch Logs client using specified profile/region or default credential chain
-        session = boto3.Session(profile_name=profile_name, region_name=region_name)
-        self.logs_client = session.client("logs")
+        # Initialize boto3 CloudWatch Logs client using specified profile/region or default credential chain.
+        # The session is kept for reuse: constructing one re-parses credential/
+        # config files, and each client load brings its own service model.
+        self._session = boto3.Session(
+            profile_name=profile_name, region_name=region_name
+        )
+        self.logs_client = self._session.client("logs", config=_CLIENT_CONFIG)
+        self._cloudwatch_client = None
+
+        # Small thread pool for overlapping independent AWS calls within one
+        # request (botocore releases the GIL while waiting on the network)
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
+    @property
+    def cloudwatch_client(self):
+        """Lazily created, cached CloudWatch metrics client."""
+        if self._cloudwatch_client is None:
+            self._cloudwatch_client = self._session.client(
+                "cloudwatch", config=_CLIENT_CONFIG
+            )
+        return self._cloudwatch_client
 
     def get_log_groups(
         self, prefix: str = None, limit: int = 50, next_token: str = None
@@ -43,66 +99,60 @@ class CloudWatchLogsResource:
         Returns:
             JSON string with log groups information
         """
-        kwargs = {"limit": limit}
+        kwargs = {}
         if prefix:
             kwargs["logGroupNamePrefix"] = prefix
+
+        # Let botocore's paginator drive the fetch: MaxItems caps the
+        # server-side iteration exactly at `limit` and resumption tokens are
+        # handled for us instead of via manual nextToken plumbing
+        pagination_config = {"MaxItems": limit, "PageSize": min(limit, 50)}
         if next_token:
-            kwargs["nextToken"] = next_token
+            pagination_config["StartingToken"] = next_token
 
-        response = self.logs_client.describe_log_groups(**kwargs)
+        paginator = self.logs_client.get_paginator("describe_log_groups")
+        response = paginator.paginate(
+            **kwargs, PaginationConfig=pagination_config
+        ).build_full_result()
         log_groups = response.get("logGroups", [])
 
-        # Format the log groups information
-        formatted_groups = []
-        for group in log_groups:
-            formatted_groups.append(
-                {
-                    "name": group.get("logGroupName"),
-                    "arn": group.get("arn"),
-                    "storedBytes": group.get("storedBytes"),
-                    "creationTime": datetime.fromtimestamp(
-                        group.get("creationTime", 0) / 1000
-                    ).isoformat(),
-                }
-            )
+        # Format the log groups information; bind fromtimestamp locally so
+        # the per-item conversions skip the global/attribute lookups
+        _fts = datetime.fromtimestamp
+        formatted_groups = [
+            {
+                "name": group.get("logGroupName"),
+                "arn": group.get("arn"),
+                "storedBytes": group.get("storedBytes"),
+                "creationTime": _fts(group.get("creationTime", 0) / 1000).isoformat(),
+            }
+            for group in log_groups
+        ]
 
-        # Include the nextToken if available
+        # Include the resumption token if the listing was truncated
         result = {"logGroups": formatted_groups}
 
-        if "nextToken" in response:
-            result["nextToken"] = response["nextToken"]
+        if "NextToken" in response:
+            result["nextToken"] = response["NextToken"]
 
-        return json.dumps(result, indent=2)
+        return _dumps(result)
 
     def get_log_group_details(self, log_group_name: str) -> str:
         """Get detailed information about a specific log group."""
         try:
-            response = self.logs_client.describe_log_groups(
-                logGroupNamePrefix=log_group_name, limit=1
-            )
-            log_groups = response.get("logGroups", [])
-
-            if not log_groups:
-                return json.dumps(
-                    {"error": f"Log group '{log_group_name}' not found"}, indent=2
-                )
-
-            log_group = log_groups[0]
-
-            # Get retention policy
-            retention = "Never Expire"
-            if "retentionInDays" in log_group:
-                retention = f"{log_group['retentionInDays']} days"
-
-            # Get metrics for the log group
-            session = boto3.Session(
-                profile_name=self.profile_name, region_name=self.region_name
-            )
-            cloudwatch = session.client("cloudwatch")
+            # The describe call and the metrics lookup are independent, so
+            # issue them concurrently; botocore releases the GIL during
+            # network I/O, making threads effective here
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=1)
 
-            metrics_response = cloudwatch.get_metric_statistics(
+            describe_future = self._executor.submit(
+                self.logs_client.describe_log_groups,
+                logGroupNamePrefix=log_group_name,
+                limit=1,
+            )
+            metrics_future = self._executor.submit(
+                self.cloudwatch_client.get_metric_statistics,
                 Namespace="AWS/Logs",
                 MetricName="IncomingBytes",
                 Dimensions=[
@@ -114,6 +164,22 @@ class CloudWatchLogsResource:
                 Statistics=["Sum"],
             )
 
+            response = describe_future.result()
+            log_groups = response.get("logGroups", [])
+
+            if not log_groups:
+                metrics_future.cancel()
+                return _dumps({"error": f"Log group '{log_group_name}' not found"})
+
+            log_group = log_groups[0]
+
+            # Get retention policy
+            retention = "Never Expire"
+            if "retentionInDays" in log_group:
+                retention = f"{log_group['retentionInDays']} days"
+
+            metrics_response = metrics_future.result()
+
             # Format the detailed information
             details = {
                 "name": log_group.get("logGroupName"),
@@ -131,9 +197,9 @@ class CloudWatchLogsResource:
                 ],
             }
 
-            return json.dumps(details, indent=2)
+            return _dumps(details)
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
+            return _dumps({"error": str(e)})
 
     def get_log_streams(self, log_group_name: str, limit: int = 20) -> str:
         """
@@ -144,40 +210,39 @@ class CloudWatchLogsResource:
             limit: Maximum number of streams to return (default: 20)
         """
         try:
-            response = self.logs_client.describe_log_streams(
+            # Paginate so limits above the API's 50-per-page cap are served
+            # in as few calls as possible, stopping exactly at `limit`
+            paginator = self.logs_client.get_paginator("describe_log_streams")
+            response = paginator.paginate(
                 logGroupName=log_group_name,
                 orderBy="LastEventTime",
                 descending=True,
-                limit=limit,
-            )
+                PaginationConfig={"MaxItems": limit, "PageSize": min(limit, 50)},
+            ).build_full_result()
 
             log_streams = response.get("logStreams", [])
-            formatted_streams = []
-
-            for stream in log_streams:
-                last_event_time = stream.get("lastEventTimestamp", 0)
-                first_event_time = stream.get("firstEventTimestamp", 0)
-
-                formatted_streams.append(
-                    {
-                        "name": stream.get("logStreamName"),
-                        "firstEventTime": datetime.fromtimestamp(
-                            first_event_time / 1000
-                        ).isoformat()
-                        if first_event_time
-                        else None,
-                        "lastEventTime": datetime.fromtimestamp(
-                            last_event_time / 1000
-                        ).isoformat()
-                        if last_event_time
-                        else None,
-                        "storedBytes": stream.get("storedBytes"),
-                    }
-                )
+            _fts = datetime.fromtimestamp
+            formatted_streams = [
+                {
+                    "name": stream.get("logStreamName"),
+                    "firstEventTime": _fts(
+                        stream["firstEventTimestamp"] / 1000
+                    ).isoformat()
+                    if stream.get("firstEventTimestamp")
+                    else None,
+                    "lastEventTime": _fts(
+                        stream["lastEventTimestamp"] / 1000
+                    ).isoformat()
+                    if stream.get("lastEventTimestamp")
+                    else None,
+                    "storedBytes": stream.get("storedBytes"),
+                }
+                for stream in log_streams
+            ]
 
-            return json.dumps(formatted_streams, indent=2)
+            return _dumps(formatted_streams)
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
+            return _dumps({"error": str(e)})
 
     def get_log_events(
         self, log_group_name: str, log_stream_name: str, limit: int = 100
@@ -199,88 +264,97 @@ class CloudWatchLogsResource:
             )
 
             events = response.get("events", [])
-            formatted_events = []
-
-            for event in events:
-                formatted_events.append(
-                    {
-                        "timestamp": datetime.fromtimestamp(
-                            event.get("timestamp", 0) / 1000
-                        ).isoformat(),
-                        "message": event.get("message"),
-                        "ingestionTime": datetime.fromtimestamp(
-                            event.get("ingestionTime", 0) / 1000
-                        ).isoformat(),
-                    }
-                )
+            _fts = datetime.fromtimestamp
+            formatted_events = [
+                {
+                    "timestamp": _fts(event.get("timestamp", 0) / 1000).isoformat(),
+                    "message": event.get("message"),
+                    "ingestionTime": _fts(
+                        event.get("ingestionTime", 0) / 1000
+                    ).isoformat(),
+                }
+                for event in events
+            ]
 
-            return json.dumps(formatted_events, indent=2)
+            return _dumps(formatted_events)
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
+            return _dumps({"error": str(e)})
 
-    def get_log_sample(self, log_group_name: str, limit: int = 10) -> str:
-        """Get a sample of recent logs from a log group."""
-        try:
-            # First get the most recent stream
-            stream_response = self.logs_client.describe_log_streams(
-                logGroupName=log_group_name,
-                orderBy="LastEventTime",
-                descending=True,
-                limit=1,
-            )
+    def _get_log_sample_events(self, log_group_name: str, limit: int) -> tuple:
+        """Fetch sample events from the most recent stream as Python objects.
 
-            log_streams = stream_response.get("logStreams", [])
-            if not log_streams:
-                return json.dumps(
-                    {"error": f"No streams found in log group '{log_group_name}'"},
-                    indent=2,
-                )
+        Returns a (log_stream_name, formatted_events) tuple so callers that
+        consume the events directly (e.g. structure analysis) avoid a JSON
+        serialize/parse round trip. log_stream_name is None when the log
+        group has no streams.
+        """
+        # First get the most recent stream
+        stream_response = self.logs_client.describe_log_streams(
+            logGroupName=log_group_name,
+            orderBy="LastEventTime",
+            descending=True,
+            limit=1,
+        )
 
-            # Get events from the most recent stream
-            log_stream_name = log_streams[0].get("logStreamName")
-            response = self.logs_client.get_log_events(
-                logGroupName=log_group_name,
-                logStreamName=log_stream_name,
-                limit=limit,
-                startFromHead=False,
-            )
+        log_streams = stream_response.get("logStreams", [])
+        if not log_streams:
+            return None, []
+
+        # Get events from the most recent stream
+        log_stream_name = log_streams[0].get("logStreamName")
+        response = self.logs_client.get_log_events(
+            logGroupName=log_group_name,
+            logStreamName=log_stream_name,
+            limit=limit,
+            startFromHead=False,
+        )
 
-            events = response.get("events", [])
-            formatted_events = []
+        events = response.get("events", [])
+        _fts = datetime.fromtimestamp
+        formatted_events = [
+            {
+                "timestamp": _fts(event.get("timestamp", 0) / 1000).isoformat(),
+                "message": event.get("message"),
+                "streamName": log_stream_name,
+            }
+            for event in events
+        ]
 
-            for event in events:
-                formatted_events.append(
-                    {
-                        "timestamp": datetime.fromtimestamp(
-                            event.get("timestamp", 0) / 1000
-                        ).isoformat(),
-                        "message": event.get("message"),
-                        "streamName": log_stream_name,
-                    }
+        return log_stream_name, formatted_events
+
+    def get_log_sample(self, log_group_name: str, limit: int = 10) -> str:
+        """Get a sample of recent logs from a log group."""
+        try:
+            log_stream_name, formatted_events = self._get_log_sample_events(
+                log_group_name, limit
+            )
+            if log_stream_name is None:
+                return _dumps(
+                    {"error": f"No streams found in log group '{log_group_name}'"}
                 )
 
-            return json.dumps(
+            return _dumps(
                 {
                     "description": f"Sample of {len(formatted_events)} recent logs from '{log_group_name}'",
                     "logStream": log_stream_name,
                     "events": formatted_events,
-                },
-                indent=2,
+                }
             )
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
+            return _dumps({"error": str(e)})
 
     def get_recent_errors(self, log_group_name: str, hours: int = 24) -> str:
         """Get recent error logs from a log group."""
         try:
-            # Calculate start time
-            end_time = int(datetime.now().timestamp() * 1000)
-            start_time = int(
-                (datetime.now() - timedelta(hours=hours)).timestamp() * 1000
-            )
-
-            # Use filter_log_events to search for errors across all streams
-            # Common error patterns to search for
+            # Millisecond epoch bounds straight from the clock — no need to
+            # build two datetime objects just to convert them back
+            end_time = time.time_ns() // 1_000_000
+            start_time = end_time - hours * 3_600_000
+
+            # Use filter_log_events to search for errors across all streams.
+            # Common error patterns to search for; the ? prefix makes the
+            # terms alternatives (OR) in CloudWatch filter syntax — bare
+            # quoted terms would require every token in one event
             error_patterns = [
                 "ERROR",
                 "Error",
@@ -293,273 +367,250 @@ class CloudWatchLogsResource:
                 "FAIL",
             ]
 
-            filter_pattern = " ".join([f'"{pattern}"' for pattern in error_patterns])
+            filter_pattern = " ".join([f'?"{pattern}"' for pattern in error_patterns])
             response = self.logs_client.filter_log_events(
                 logGroupName=log_group_name,
-                filterPattern=f"{filter_pattern}",
+                filterPattern=filter_pattern,
                 startTime=start_time,
                 endTime=end_time,
                 limit=100,
             )
 
             events = response.get("events", [])
-            formatted_events = []
-
-            for event in events:
-                formatted_events.append(
-                    {
-                        "timestamp": datetime.fromtimestamp(
-                            event.get("timestamp", 0) / 1000
-                        ).isoformat(),
-                        "message": event.get("message"),
-                        "logStreamName": event.get("logStreamName"),
-                    }
-                )
+            _fts = datetime.fromtimestamp
+            formatted_events = [
+                {
+                    "timestamp": _fts(event.get("timestamp", 0) / 1000).isoformat(),
+                    "message": event.get("message"),
+                    "logStreamName": event.get("logStreamName"),
+                }
+                for event in events
+            ]
 
-            return json.dumps(
+            return _dumps(
                 {
                     "description": f"Recent errors from '{log_group_name}' in the last {hours} hours",
                     "totalErrors": len(formatted_events),
                     "events": formatted_events,
-                },
-                indent=2,
+                }
             )
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
+            return _dumps({"error": str(e)})
 
     def get_log_metrics(self, log_group_name: str, hours: int = 24) -> str:
         """Get log volume metrics for a log group."""
         try:
-            # Create CloudWatch client
-            session = boto3.Session(
-                profile_name=self.profile_name, region_name=self.region_name
-            )
-            cloudwatch = session.client("cloudwatch")
+            # Reuse the cached CloudWatch client
+            cloudwatch = self.cloudwatch_client
 
             # Calculate start and end times
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(hours=hours)
 
-            # Get incoming bytes
-            incoming_bytes = cloudwatch.get_metric_statistics(
-                Namespace="AWS/Logs",
-                MetricName="IncomingBytes",
-                Dimensions=[
-                    {"Name": "LogGroupName", "Value": log_group_name},
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=3600,  # 1 hour periods
-                Statistics=["Sum"],
-            )
-
-            # Get incoming log events
-            incoming_events = cloudwatch.get_metric_statistics(
-                Namespace="AWS/Logs",
-                MetricName="IncomingLogEvents",
-                Dimensions=[
-                    {"Name": "LogGroupName", "Value": log_group_name},
+            # Fetch both metrics in one get_metric_data round trip instead of
+            # two sequential get_metric_statistics calls; ScanBy returns the
+            # datapoints already time-ordered
+            dimensions = [{"Name": "LogGroupName", "Value": log_group_name}]
+            response = cloudwatch.get_metric_data(
+                MetricDataQueries=[
+                    {
+                        "Id": "incoming_bytes",
+                        "MetricStat": {
+                            "Metric": {
+                                "Namespace": "AWS/Logs",
+                                "MetricName": "IncomingBytes",
+                                "Dimensions": dimensions,
+                            },
+                            "Period": 3600,  # 1 hour periods
+                            "Stat": "Sum",
+                        },
+                    },
+                    {
+                        "Id": "incoming_events",
+                        "MetricStat": {
+                            "Metric": {
+                                "Namespace": "AWS/Logs",
+                                "MetricName": "IncomingLogEvents",
+                                "Dimensions": dimensions,
+                            },
+                            "Period": 3600,  # 1 hour periods
+                            "Stat": "Sum",
+                        },
+                    },
                 ],
                 StartTime=start_time,
                 EndTime=end_time,
-                Period=3600,  # 1 hour periods
-                Statistics=["Sum"],
+                ScanBy="TimestampAscending",
             )
 
-            # Format metrics data
-            bytes_datapoints = incoming_bytes.get("Datapoints", [])
-            events_datapoints = incoming_events.get("Datapoints", [])
-
-            bytes_datapoints.sort(key=lambda x: x["Timestamp"])
-            events_datapoints.sort(key=lambda x: x["Timestamp"])
+            results = {result["Id"]: result for result in response["MetricDataResults"]}
+            bytes_result = results["incoming_bytes"]
+            events_result = results["incoming_events"]
 
             bytes_data = [
-                {"timestamp": point["Timestamp"].isoformat(), "bytes": point["Sum"]}
-                for point in bytes_datapoints
+                {"timestamp": timestamp.isoformat(), "bytes": value}
+                for timestamp, value in zip(
+                    bytes_result["Timestamps"], bytes_result["Values"]
+                )
             ]
 
             events_data = [
-                {"timestamp": point["Timestamp"].isoformat(), "events": point["Sum"]}
-                for point in events_datapoints
+                {"timestamp": timestamp.isoformat(), "events": value}
+                for timestamp, value in zip(
+                    events_result["Timestamps"], events_result["Values"]
+                )
             ]
 
             # Calculate totals
-            total_bytes = sum(point["Sum"] for point in bytes_datapoints)
-            total_events = sum(point["Sum"] for point in events_datapoints)
+            total_bytes = sum(bytes_result["Values"])
+            total_events = sum(events_result["Values"])
 
-            return json.dumps(
+            return _dumps(
                 {
                     "description": f"Log metrics for '{log_group_name}' over the last {hours} hours",
                     "totalBytes": total_bytes,
                     "totalEvents": total_events,
                     "bytesByHour": bytes_data,
                     "eventsByHour": events_data,
-                },
-                indent=2,
+                }
             )
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
+            return _dumps({"error": str(e)})
 
     def analyze_log_structure(self, log_group_name: str) -> str:
         """Analyze and provide information about the structure of logs."""
         try:
-            # Get a sample of logs to analyze
-            sample_data = json.loads(self.get_log_sample(log_group_name, 50))
-
-            if "error" in sample_data:
-                return json.dumps(sample_data, indent=2)
+            # Get a sample of logs to analyze, as Python objects (no JSON
+            # round trip through get_log_sample's string output)
+            log_stream_name, events = self._get_log_sample_events(log_group_name, 50)
 
-            events = sample_data.get("events", [])
+            if log_stream_name is None:
+                return _dumps(
+                    {"error": f"No streams found in log group '{log_group_name}'"}
+                )
 
             if not events:
-                return json.dumps(
-                    {"error": "No log events found for analysis"}, indent=2
-                )
+                return _dumps({"error": "No log events found for analysis"})
 
             # Analyze the structure
+            format_type, common_patterns, field_analysis = self._analyze_events(events)
             structure_info = {
                 "description": f"Log structure analysis for '{log_group_name}'",
                 "sampleSize": len(events),
-                "format": self._detect_log_format(events),
-                "commonPatterns": self._extract_common_patterns(events),
-                "fieldAnalysis": self._analyze_fields(events),
+                "format": format_type,
+                "commonPatterns": common_patterns,
+                "fieldAnalysis": field_analysis,
             }
 
-            return json.dumps(structure_info, indent=2)
+            return _dumps(structure_info)
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
+            return _dumps({"error": str(e)})
+
+    def _analyze_events(self, events: List[Dict]) -> tuple:
+        """Classify format, count patterns, and collect fields in one pass.
 
-    def _detect_log_format(self, events: List[Dict]) -> str:
-        """Detect the format of logs (JSON, plaintext, etc.)."""
+        Replaces the previous detect/patterns/fields trio, which walked the
+        sample three times (and re-parsed every JSON-shaped message twice).
+        A single traversal classifies each message once, reusing the parsed
+        JSON dict for the field counts.
+
+        Returns:
+            Tuple of (format string, common-patterns dict, field-analysis dict)
+        """
         json_count = 0
-        key_value_count = 0
         xml_count = 0
+        key_value_count = 0
+        levels = Counter()
+        has_timestamp = 0
+        json_fields = Counter()
+        kv_fields = Counter()
 
         for event in events:
             message = event.get("message", "")
-
-            # Check for JSON format
-            if message.strip().startswith("{") and message.strip().endswith("}"):
+            stripped = message.strip()
+
+            # Classify the message format, keeping the parsed JSON for the
+            # field counts below. The structural prefilter (brace-wrapped,
+            # quoted key, a colon) rejects most non-JSON brace-wrapped
+            # messages without paying for the parser's exception path. It
+            # must never reject what the parser accepts — a brace count, for
+            # example, misfires on string values like {"msg": "a{b"}.
+            parsed = None
+            if (
+                stripped.startswith("{")
+                and stripped.endswith("}")
+                and '"' in stripped
+                and ":" in stripped
+            ):
                 try:
-                    json.loads(message)
-                    json_count += 1
-                    continue
-                except json.JSONDecodeError:
-                    pass
-
-            # Check for XML format
-            if message.strip().startswith("<") and message.strip().endswith(">"):
+                    parsed = _loads(message)
+                except ValueError:
+                    parsed = None
+
+            if parsed is not None:
+                json_count += 1
+                json_fields.update(parsed.keys())
+            elif stripped.startswith("<") and stripped.endswith(">"):
                 xml_count += 1
-                continue
-
-            # Check for key-value pairs
-            if re.search(r"\w+=[\'\"][^\'\"]*[\'\"]|\w+=\S+", message):
+            elif _KV_PRESENT_RE.search(message):
                 key_value_count += 1
+                kv_fields.update(key for key, _ in _KV_FIELD_RE.findall(message))
+
+            # Check log levels and in-message timestamps (not the event
+            # timestamp) in one pass over the alternation; stop as soon as
+            # both have been seen
+            level = None
+            ts_seen = False
+            for match in _CLASSIFY_RE.finditer(message):
+                if match.lastgroup == "lvl":
+                    if level is None:
+                        level = match.group("lvl")
+                else:
+                    ts_seen = True
+                if level is not None and ts_seen:
+                    break
+            if level is not None:
+                levels[level] += 1
+            has_timestamp += ts_seen
 
         total = len(events)
-
         if json_count > total * 0.7:
-            return "JSON"
+            format_type = "JSON"
         elif xml_count > total * 0.7:
-            return "XML"
+            format_type = "XML"
         elif key_value_count > total * 0.7:
-            return "Key-Value Pairs"
+            format_type = "Key-Value Pairs"
         else:
-            return "Plaintext/Unstructured"
-
-    def _extract_common_patterns(self, events: List[Dict]) -> Dict:
-        """Extract common patterns from log messages."""
-        # Look for common log patterns
-        level_pattern = re.compile(
-            r"\b(DEBUG|INFO|WARN|WARNING|ERROR|FATAL|CRITICAL)\b"
-        )
-        timestamp_patterns = [
-            re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"),  # ISO format
-            re.compile(
-                r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"
-            ),  # Common datetime format
-            re.compile(r"\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2}"),  # MM/DD/YYYY format
-        ]
-
-        # Count occurrences
-        levels = Counter()
-        has_timestamp = 0
-
-        for event in events:
-            message = event.get("message", "")
+            format_type = "Plaintext/Unstructured"
 
-            # Check log levels
-            level_match = level_pattern.search(message)
-            if level_match:
-                levels[level_match.group(0)] += 1
-
-            # Check timestamps in message content (not event timestamp)
-            for pattern in timestamp_patterns:
-                if pattern.search(message):
-                    has_timestamp += 1
-                    break
-
-        return {
+        common_patterns = {
             "logLevels": dict(levels),
             "containsTimestamp": has_timestamp,
-            "timestampPercentage": round((has_timestamp / len(events)) * 100, 2)
+            "timestampPercentage": round((has_timestamp / total) * 100, 2)
             if events
             else 0,
         }
 
-    def _analyze_fields(self, events: List[Dict]) -> Dict:
-        """Analyze fields in structured log messages."""
-        format_type = self._detect_log_format(events)
-
         if format_type == "JSON":
-            # Try to extract fields from JSON logs
-            fields_count = Counter()
-
-            for event in events:
-                message = event.get("message", "")
-                try:
-                    json_data = json.loads(message)
-                    for key in json_data.keys():
-                        fields_count[key] += 1
-                except json.JSONDecodeError:
-                    continue
-
-            # Get the most common fields
-            common_fields = [
-                {
-                    "field": field,
-                    "occurrences": count,
-                    "percentage": round((count / len(events)) * 100, 2),
-                }
-                for field, count in fields_count.most_common(10)
-            ]
-
-            return {"commonFields": common_fields, "uniqueFields": len(fields_count)}
-
+            field_analysis = self._summarize_fields(json_fields, total)
         elif format_type == "Key-Value Pairs":
-            # Try to extract key-value pairs
-            key_pattern = re.compile(r"(\w+)=[\'\"]?([^\'\"\s]*)[\'\"]?")
-            fields_count = Counter()
-
-            for event in events:
-                message = event.get("message", "")
-                matches = key_pattern.findall(message)
-                for key, _ in matches:
-                    fields_count[key] += 1
-
-            # Get the most common fields
-            common_fields = [
-                {
-                    "field": field,
-                    "occurrences": count,
-                    "percentage": round((count / len(events)) * 100, 2),
-                }
-                for field, count in fields_count.most_common(10)
-            ]
-
-            return {"commonFields": common_fields, "uniqueFields": len(fields_count)}
-
+            field_analysis = self._summarize_fields(kv_fields, total)
         else:
-            return {
+            field_analysis = {
                 "analysis": f"Field analysis not applicable for {format_type} format"
             }
+
+        return format_type, common_patterns, field_analysis
+
+    @staticmethod
+    def _summarize_fields(fields_count: Counter, total: int) -> Dict:
+        """Build the common-fields summary from accumulated field counts."""
+        common_fields = [
+            {
+                "field": field,
+                "occurrences": count,
+                "percentage": round((count / total) * 100, 2),
+            }
+            for field, count in fields_count.most_common(10)
+        ]
+        return {"commonFields": common_fields, "uniqueFields": len(fields_count)}
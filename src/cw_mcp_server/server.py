@@ -4,7 +4,9 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import argparse
+import json
 from typing import List, Callable, Any, Type, Optional
+from urllib.parse import unquote
 from functools import wraps
 import asyncio
 
@@ -47,6 +49,23 @@ default_profile = args.profile
 default_region = args.region
 
 
+# Tool-class instances keyed by (class, profile, region). Constructing an
+# instance builds a boto3 Session (credential/config file parsing) and a
+# client (service model load), so reuse one per configuration across calls.
+_tool_instances: dict = {}
+
+
+def _get_tool_instance(tool_class: Type, profile: str, region: str) -> Any:
+    """Return a cached tool-class instance for the given AWS configuration."""
+    key = (tool_class, profile, region)
+    instance = _tool_instances.get(key)
+    if instance is None:
+        instance = _tool_instances[key] = tool_class(
+            profile_name=profile, region_name=region
+        )
+    return instance
+
+
 # Helper decorator to handle profile and region parameters for tools
 def with_aws_config(tool_class: Type, method_name: Optional[str] = None) -> Callable:
     """
@@ -64,7 +83,7 @@ def with_aws_config(tool_class: Type, method_name: Optional[str] = None) -> Call
             try:
                 profile = kwargs.pop("profile", None) or default_profile
                 region = kwargs.pop("region", None) or default_region
-                tool_instance = tool_class(profile_name=profile, region_name=region)
+                tool_instance = _get_tool_instance(tool_class, profile, region)
                 target_method = method_name or func.__name__
                 method = getattr(tool_instance, target_method)
                 result = method(**kwargs)
@@ -113,13 +132,13 @@ def get_filtered_log_groups(prefix: str) -> str:
     limit = 50
     next_token = None
 
-    return cw_resource.get_log_groups(prefix, limit, next_token)
+    return cw_resource.get_log_groups(unquote(prefix), limit, next_token)
 
 
 @mcp.resource("logs://groups/{log_group_name}")
 def get_log_group_details(log_group_name: str) -> str:
     """Get detailed information about a specific log group"""
-    return cw_resource.get_log_group_details(log_group_name)
+    return cw_resource.get_log_group_details(unquote(log_group_name))
 
 
 @mcp.resource("logs://groups/{log_group_name}/streams")
@@ -132,7 +151,7 @@ def get_log_streams(log_group_name: str) -> str:
     """
     # Use default limit value
     limit = 20
-    return cw_resource.get_log_streams(log_group_name, limit)
+    return cw_resource.get_log_streams(unquote(log_group_name), limit)
 
 
 @mcp.resource("logs://groups/{log_group_name}/streams/{log_stream_name}")
@@ -146,7 +165,9 @@ def get_log_events(log_group_name: str, log_stream_name: str) -> str:
     """
     # Use default limit value
     limit = 100
-    return cw_resource.get_log_events(log_group_name, log_stream_name, limit)
+    return cw_resource.get_log_events(
+        unquote(log_group_name), unquote(log_stream_name), limit
+    )
 
 
 @mcp.resource("logs://groups/{log_group_name}/sample")
@@ -159,7 +180,7 @@ def get_log_sample(log_group_name: str) -> str:
     """
     # Use default limit value
     limit = 10
-    return cw_resource.get_log_sample(log_group_name, limit)
+    return cw_resource.get_log_sample(unquote(log_group_name), limit)
 
 
 @mcp.resource("logs://groups/{log_group_name}/recent-errors")
@@ -172,7 +193,7 @@ def get_recent_errors(log_group_name: str) -> str:
     """
     # Use default hours value
     hours = 24
-    return cw_resource.get_recent_errors(log_group_name, hours)
+    return cw_resource.get_recent_errors(unquote(log_group_name), hours)
 
 
 @mcp.resource("logs://groups/{log_group_name}/metrics")
@@ -185,13 +206,13 @@ def get_log_metrics(log_group_name: str) -> str:
     """
     # Use default hours value
     hours = 24
-    return cw_resource.get_log_metrics(log_group_name, hours)
+    return cw_resource.get_log_metrics(unquote(log_group_name), hours)
 
 
 @mcp.resource("logs://groups/{log_group_name}/structure")
 def analyze_log_structure(log_group_name: str) -> str:
     """Analyze and provide information about the structure of logs"""
-    return cw_resource.analyze_log_structure(log_group_name)
+    return cw_resource.analyze_log_structure(unquote(log_group_name))
 
 
 # ==============================
@@ -370,6 +391,8 @@ async def filter_log_events(
     hours: int = 24,
     start_time: str = None,
     end_time: str = None,
+    max_events: int = 100,
+    paginate: bool = False,
     profile: str = None,
     region: str = None,
 ) -> str:
@@ -384,6 +407,10 @@ async def filter_log_events(
             interpreted as UTC; explicit offsets (e.g. "Z" or "+09:00") are honored.
         end_time: Optional ISO8601 end time. Naive (offset-less) values are
             interpreted as UTC; explicit offsets (e.g. "Z" or "+09:00") are honored.
+        max_events: Maximum number of events to return (default: 100)
+        paginate: Follow result pagination until max_events accumulate or the
+            window is exhausted; off by default, where only the first page of
+            events is returned
         profile: Optional AWS profile name to use for credentials
         region: Optional AWS region name to use for API calls
 
@@ -431,6 +458,7 @@ async def find_error_patterns(
     hours: int = 24,
     start_time: str = None,
     end_time: str = None,
+    max_items: int = 20,
     profile: str = None,
     region: str = None,
 ) -> str:
@@ -444,6 +472,7 @@ async def find_error_patterns(
             interpreted as UTC; explicit offsets (e.g. "Z" or "+09:00") are honored.
         end_time: Optional ISO8601 end time. Naive (offset-less) values are
             interpreted as UTC; explicit offsets (e.g. "Z" or "+09:00") are honored.
+        max_items: Maximum number of patterns to return (default: 20)
         profile: Optional AWS profile name to use for credentials
         region: Optional AWS region name to use for API calls
 
@@ -462,6 +491,7 @@ async def correlate_logs(
     hours: int = 24,
     start_time: str = None,
     end_time: str = None,
+    max_items: int = 100,
     profile: str = None,
     region: str = None,
 ) -> str:
@@ -476,6 +506,10 @@ async def correlate_logs(
             interpreted as UTC; explicit offsets (e.g. "Z" or "+09:00") are honored.
         end_time: Optional ISO8601 end time. Naive (offset-less) values are
             interpreted as UTC; explicit offsets (e.g. "Z" or "+09:00") are honored.
+        max_items: Matching events to keep per log group (default: 100). The
+            underlying query fetches a shared budget of max_items per group,
+            so one very chatty group can crowd out quieter ones, but each
+            group's returned events are always capped at max_items
         profile: Optional AWS profile name to use for credentials
         region: Optional AWS region name to use for API calls
 
@@ -486,6 +520,57 @@ async def correlate_logs(
     pass
 
 
+# Tools that batch_execute may dispatch to (the with_aws_config wrappers, so
+# per-op profile/region overrides keep working)
+_BATCH_TOOLS = {
+    "list_log_groups": list_log_groups,
+    "search_logs": search_logs,
+    "search_logs_multi": search_logs_multi,
+    "filter_log_events": filter_log_events,
+    "summarize_log_activity": summarize_log_activity,
+    "find_error_patterns": find_error_patterns,
+    "correlate_logs": correlate_logs,
+}
+
+
+@mcp.tool()
+async def batch_execute(operations: List[dict], max_concurrent: int = 8) -> str:
+    """
+    Run several tool calls concurrently in a single MCP round trip.
+
+    Collapses N request/response exchanges into one and overlaps the
+    underlying CloudWatch API latency across operations via asyncio.gather,
+    bounded by a semaphore.
+
+    Args:
+        operations: List of {"name": tool_name, "args": {...}} operations;
+            each name must be one of the other tools exposed by this server
+        max_concurrent: Maximum number of operations to run at once (default: 8)
+
+    Returns:
+        JSON string with one result per operation, in the input order
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run_one(operation: dict) -> dict:
+        name = operation.get("name")
+        tool = _BATCH_TOOLS.get(name)
+        if tool is None:
+            return {"status": "Error", "error": f"Unknown tool: {name}"}
+        try:
+            async with semaphore:
+                result = await tool(**operation.get("args", {}))
+        except Exception as e:
+            return {"status": "Error", "error": str(e)}
+        try:
+            return json.loads(result)
+        except (TypeError, ValueError):
+            return {"status": "Error", "error": str(result)}
+
+    results = await asyncio.gather(*(run_one(operation) for operation in operations))
+    return json.dumps({"results": results}, indent=2)
+
+
 def main() -> None:
     # Run the MCP server
     mcp.run()
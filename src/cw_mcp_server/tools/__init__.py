@@ -2,10 +2,11 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import functools
-import json
 import traceback
 from typing import Callable
 
+from .utils import dumps
+
 
 def handle_exceptions(func: Callable) -> Callable:
     """
@@ -19,13 +20,18 @@ def handle_exceptions(func: Callable) -> Callable:
         try:
             return await func(*args, **kwargs)
         except Exception as e:
-            error_traceback = traceback.format_exc()
+            # Only the final "Type: message" line goes into the response, so
+            # render just that instead of walking and stringifying the whole
+            # stack with format_exc
+            details = "".join(traceback.format_exception_only(e.__class__, e)).rstrip(
+                "\n"
+            )
             error_response = {
                 "status": "Error",
                 "error": str(e),
                 "error_type": e.__class__.__name__,
-                "details": error_traceback.split("\n")[-2] if error_traceback else None,
+                "details": details.rsplit("\n", 1)[-1],
             }
-            return json.dumps(error_response, indent=2)
+            return dumps(error_response)
 
     return wrapper
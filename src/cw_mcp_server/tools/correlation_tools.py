@@ -4,14 +4,19 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import asyncio
-import boto3
-import json
-import time
-from datetime import datetime
+import heapq
 from typing import List
 
 from . import handle_exceptions
-from .utils import get_time_range
+from .utils import (
+    chunked,
+    collect_query_results,
+    dumps,
+    get_logs_client,
+    get_time_range,
+    iso_from_ms,
+    poll_query_results,
+)
 
 
 class CloudWatchLogsCorrelationTools:
@@ -24,11 +29,39 @@ class CloudWatchLogsCorrelationTools:
             profile_name: Optional AWS profile name to use for credentials
             region_name: Optional AWS region name to use for API calls
         """
-        # Initialize boto3 CloudWatch Logs client using specified profile/region or default credential chain
+        # Reuse the cached CloudWatch Logs client for this profile/region
+        # instead of rebuilding a session and client per instance
         self.profile_name = profile_name
         self.region_name = region_name
-        session = boto3.Session(profile_name=profile_name, region_name=region_name)
-        self.logs_client = session.client("logs")
+        self.logs_client = get_logs_client(profile_name, region_name)
+
+    async def _run_insights_query(
+        self, log_group_names: List[str], query: str, start_ts: int, end_ts: int
+    ) -> dict:
+        """Start an Insights query over a batch of log groups and poll it.
+
+        The blocking boto3 calls run via asyncio.to_thread so several of
+        these coroutines can genuinely overlap on the event loop.
+
+        Returns:
+            The final get_query_results response, or a synthetic Timeout
+            response if the query exceeds 60 seconds.
+        """
+        start_query_response = await asyncio.to_thread(
+            self.logs_client.start_query,
+            logGroupNames=log_group_names,
+            startTime=start_ts,
+            endTime=end_ts,
+            queryString=query,
+        )
+
+        query_id = start_query_response["queryId"]
+        response = await poll_query_results(self.logs_client, query_id)
+        if response.get("nextToken"):
+            response["results"] = await collect_query_results(
+                self.logs_client, query_id, response
+            )
+        return response
 
     @handle_exceptions
     async def correlate_logs(
@@ -38,6 +71,7 @@ class CloudWatchLogsCorrelationTools:
         hours: int = 24,
         start_time: str = None,
         end_time: str = None,
+        max_items: int = 100,
     ) -> str:
         """
         Correlate logs across multiple AWS services using a common search term.
@@ -50,6 +84,11 @@ class CloudWatchLogsCorrelationTools:
                 are interpreted as UTC; explicit offsets are honored.
             end_time: End time in ISO8601 format. Naive (offset-less) values are
                 interpreted as UTC; explicit offsets are honored.
+            max_items: Matching events to keep per log group (default: 100).
+                The batched query fetches a shared budget of max_items per
+                group; a very chatty group can consume budget that quieter
+                groups would otherwise use, but each group's returned events
+                are always capped at max_items.
 
         Returns:
             JSON string with correlated events
@@ -58,20 +97,35 @@ class CloudWatchLogsCorrelationTools:
 
         # Validate inputs
         if not log_group_names:
-            return json.dumps(
-                {"status": "Error", "error": "No log groups specified"}, indent=2
-            )
+            return dumps({"status": "Error", "error": "No log groups specified"})
 
         if not search_term:
-            return json.dumps(
-                {"status": "Error", "error": "No search term specified"}, indent=2
+            return dumps({"status": "Error", "error": "No search term specified"})
+
+        # The term is interpolated into a quoted query literal: quotes or
+        # backslashes would break out of it, and very short terms match
+        # nearly every event — a full scan billed per byte
+        if any(ch in search_term for ch in '"\\\n'):
+            return dumps(
+                {
+                    "status": "Error",
+                    "error": "search_term must not contain quote, backslash, or newline characters",
+                }
+            )
+
+        if len(search_term) < 4:
+            return dumps(
+                {
+                    "status": "Error",
+                    "error": "search_term must be at least 4 characters; shorter terms match too broadly",
+                }
             )
 
         # Results dictionary
         results = {
             "timeRange": {
-                "start": datetime.fromtimestamp(start_ts / 1000).isoformat(),
-                "end": datetime.fromtimestamp(end_ts / 1000).isoformat(),
+                "start": iso_from_ms(start_ts),
+                "end": iso_from_ms(end_ts),
                 "hours": hours,
             },
             "searchTerm": search_term,
@@ -79,66 +133,73 @@ class CloudWatchLogsCorrelationTools:
             "correlatedEvents": [],
         }
 
-        # Get relevant logs from each group
-        for log_group_name in log_group_names:
-            # Use CloudWatch Logs Insights query
-            query = f"""
-            filter @message like "{search_term}"
-            | sort @timestamp asc
-            | limit 100
-            """
-
-            # Start the query
-            query_start_time = time.time()
-            start_query_response = self.logs_client.start_query(
-                logGroupName=log_group_name,
-                startTime=start_ts,
-                endTime=end_ts,
-                queryString=query,
-            )
-
-            query_id = start_query_response["queryId"]
-
-            # Poll for query results
-            response = None
-            while response is None or response["status"] == "Running":
-                await asyncio.sleep(1)  # Wait before checking again
-                response = self.logs_client.get_query_results(queryId=query_id)
-
-                # Avoid long-running queries
-                if response["status"] == "Running":
-                    # Check if we've been running too long (60 seconds)
-                    if time.time() - query_start_time > 60:
-                        response = {"status": "Timeout", "results": []}
-                        break
+        # One query covers every log group in the batch instead of a query
+        # per group: Insights fans out across the groups itself and we pay a
+        # single start/poll cycle. @log carries each row's source group so
+        # results can be attributed back. The limit scales with the group
+        # count to keep per-group volume comparable to the old per-group
+        # queries, capped at Insights' 10k per-query maximum.
+        query = f"""
+        fields @timestamp, @message, @logStream, @log
+        | filter strcontains(@message, "{search_term}")
+        | sort @timestamp asc
+        | limit {min(max(max_items, 1) * len(log_group_names), 10000)}
+        """
 
-            # Process results for this log group
-            log_group_events = []
+        # StartQuery accepts at most 50 log groups, so batch above that and
+        # run the batches concurrently
+        batches = chunked(log_group_names, 50)
+        responses = await asyncio.gather(
+            *(
+                self._run_insights_query(batch, query, start_ts, end_ts)
+                for batch in batches
+            )
+        )
 
+        # Attribute each row back to its log group via @log, which holds
+        # "<account-id>:<log-group-name>"
+        events_by_group = {log_group_name: [] for log_group_name in log_group_names}
+        for response in responses:
             for result in response.get("results", []):
-                event = {"logGroup": log_group_name, "timestamp": None, "message": None}
-
-                for field in result:
-                    if field["field"] == "@timestamp":
-                        event["timestamp"] = field["value"]
-                    elif field["field"] == "@message":
-                        event["message"] = field["value"]
-                    elif field["field"] == "@logStream":
-                        event["logStream"] = field["value"]
-
-                if event["timestamp"] and event["message"]:
-                    log_group_events.append(event)
-                    results["correlatedEvents"].append(event)
-
-            # Store events for this log group
+                field_map = {field["field"]: field["value"] for field in result}
+                timestamp = field_map.get("@timestamp")
+                message = field_map.get("@message")
+
+                if timestamp and message:
+                    log_id = field_map.get("@log", "")
+                    group_name = log_id.partition(":")[2] or log_id
+                    if group_name not in events_by_group:
+                        continue
+                    event = {
+                        "logGroup": group_name,
+                        "timestamp": timestamp,
+                        "message": message,
+                    }
+                    if "@logStream" in field_map:
+                        event["logStream"] = field_map["@logStream"]
+                    events_by_group[group_name].append(event)
+
+        # Cap each group at max_items client-side. The single batched query
+        # applies one global limit with an ascending sort, so a chatty group
+        # can fill more than its share of the fetched rows; the cap keeps
+        # the per-group contract even then. Each group's rows come from one
+        # batch response and arrive time-ordered, so this keeps the earliest.
+        for log_group_events in events_by_group.values():
+            del log_group_events[max_items:]
+
+        # Store events for each log group
+        per_group_events = list(events_by_group.values())
+        for log_group_name, log_group_events in events_by_group.items():
             results["logGroups"][log_group_name] = {
                 "eventCount": len(log_group_events),
                 "events": log_group_events,
             }
 
-        # Sort all correlated events by timestamp
-        results["correlatedEvents"] = sorted(
-            results["correlatedEvents"], key=lambda x: x.get("timestamp", "")
+        # Each group's events arrive already sorted ascending (the query
+        # orders by @timestamp), so a K-way merge builds the combined
+        # timeline in O(N log K) instead of re-sorting the whole list
+        results["correlatedEvents"] = list(
+            heapq.merge(*per_group_events, key=lambda event: event["timestamp"])
         )
 
-        return json.dumps(results, indent=2)
+        return dumps(results)
@@ -4,14 +4,19 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import asyncio
-import boto3
-import json
-import time
-from datetime import datetime
 from typing import List
 
 from . import handle_exceptions
-from .utils import get_time_range
+from .utils import (
+    chunked,
+    dumps,
+    get_logs_client,
+    get_time_range,
+    iso_from_event_ms,
+    poll_query_results,
+    query_cache_get,
+    query_cache_put,
+)
 
 
 class CloudWatchLogsSearchTools:
@@ -24,11 +29,42 @@ class CloudWatchLogsSearchTools:
             profile_name: Optional AWS profile name to use for credentials
             region_name: Optional AWS region name to use for API calls
         """
-        # Initialize boto3 CloudWatch Logs client using specified profile/region or default credential chain
+        # Reuse the cached CloudWatch Logs client for this profile/region
+        # instead of rebuilding a session and client per instance
         self.profile_name = profile_name
         self.region_name = region_name
-        session = boto3.Session(profile_name=profile_name, region_name=region_name)
-        self.logs_client = session.client("logs")
+        self.logs_client = get_logs_client(profile_name, region_name)
+
+    async def _run_search_query(
+        self, log_group_names: List[str], query: str, start_ts: int, end_ts: int
+    ) -> dict:
+        """Start an Insights query over a batch of log groups and poll it.
+
+        Returns:
+            The final get_query_results response, or a synthetic Timeout
+            response if the query exceeds the polling deadline.
+        """
+        # Single-group searches — the dominant call shape, via search_logs —
+        # use the scalar logGroupName parameter rather than wrapping the one
+        # group in a logGroupNames list
+        if len(log_group_names) == 1:
+            group_kwargs = {"logGroupName": log_group_names[0]}
+        else:
+            group_kwargs = {"logGroupNames": log_group_names}
+
+        # Start the query off the event loop so concurrent batches (and
+        # other tools) keep serving while boto3 blocks on the network
+        start_query_response = await asyncio.to_thread(
+            self.logs_client.start_query,
+            startTime=start_ts,
+            endTime=end_ts,
+            queryString=query,
+            limit=100,
+            **group_kwargs,
+        )
+        return await poll_query_results(
+            self.logs_client, start_query_response["queryId"]
+        )
 
     @handle_exceptions
     async def search_logs(
@@ -83,51 +119,91 @@ class CloudWatchLogsSearchTools:
             JSON string with search results
         """
         start_ts, end_ts = get_time_range(hours, start_time, end_time)
-        # Start the query
-        query_start_time = time.time()
-        start_query_response = self.logs_client.start_query(
-            logGroupNames=log_group_names,
-            startTime=start_ts,
-            endTime=end_ts,
-            queryString=query,
-            limit=100,
+
+        # Identical searches repeated within the cache TTL (dashboard-style
+        # refreshes, an assistant retrying a tool call) reuse the formatted
+        # response instead of paying another billed Insights scan. Group
+        # order doesn't affect the result, so the key sorts the groups.
+        cache_key = (
+            "search",
+            self.profile_name,
+            self.region_name,
+            tuple(sorted(log_group_names)),
+            query,
+            hours,
+            start_ts // 60000,
+            end_ts // 60000,
         )
-        query_id = start_query_response["queryId"]
-
-        # Poll for query results
-        response = None
-        while response is None or response["status"] == "Running":
-            await asyncio.sleep(1)  # Wait before checking again
-            response = self.logs_client.get_query_results(queryId=query_id)
-            elapsed_time = time.time() - query_start_time
-
-            # Avoid long-running queries
-            if response["status"] == "Running":
-                # Check if we've been running too long (60 seconds)
-                if elapsed_time > 60:
-                    return json.dumps(
-                        {
-                            "status": "Timeout",
-                            "error": "Search query failed to complete within time limit",
-                        },
-                        indent=2,
+        cached = query_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        # StartQuery accepts at most 50 log groups, so batch above that and
+        # run the batches concurrently. Each batch is one query: Insights
+        # fans out across its groups itself, so N groups cost ceil(N/50)
+        # start/poll cycles instead of N. Within each batch the query is
+        # checked immediately, then polled with exponential backoff (100 ms
+        # up to 2 s) under a 60 s deadline.
+        batches = chunked(log_group_names, 50)
+        pending = {
+            asyncio.ensure_future(
+                self._run_search_query(batch, query, start_ts, end_ts)
+            )
+            for batch in batches
+        }
+
+        # Merge batch responses as each one finishes rather than awaiting
+        # them in submission order: counters (recordsMatched, bytesScanned,
+        # ...) are summed, the first non-Complete status wins, and once the
+        # 100-row response cap is reached the still-running batches are
+        # cancelled instead of being polled to completion
+        status = "Complete"
+        statistics = {}
+        rows = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    response = task.result()
+                    if response["status"] == "Timeout":
+                        return dumps(
+                            {
+                                "status": "Timeout",
+                                "error": "Search query failed to complete within time limit",
+                            }
+                        )
+                    if response["status"] != "Complete" and status == "Complete":
+                        status = response["status"]
+                    for key, value in response.get("statistics", {}).items():
+                        statistics[key] = statistics.get(key, 0) + value
+                    # One dict comprehension per row replaces the per-field
+                    # append loop, matching how the other tools flatten
+                    # Insights field lists
+                    rows.extend(
+                        {field["field"]: field["value"] for field in result}
+                        for result in response.get("results", [])
                     )
+                if len(rows) >= 100:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
 
-        # Process and format the results
         formatted_results = {
-            "status": response["status"],
-            "statistics": response.get("statistics", {}),
+            "status": status,
+            "statistics": statistics,
             "searchedLogGroups": log_group_names,
-            "results": [],
+            "results": rows[:100],
         }
 
-        for result in response.get("results", []):
-            result_dict = {}
-            for field in result:
-                result_dict[field["field"]] = field["value"]
-            formatted_results["results"].append(result_dict)
-
-        return json.dumps(formatted_results, indent=2)
+        payload = dumps(formatted_results)
+        # Only completed queries are worth replaying; partial statuses
+        # (Failed, Cancelled) should be retried against the service
+        if status == "Complete":
+            query_cache_put(cache_key, payload)
+        return payload
 
     @handle_exceptions
     async def filter_log_events(
@@ -137,6 +213,8 @@ class CloudWatchLogsSearchTools:
         hours: int = 24,
         start_time: str = None,
         end_time: str = None,
+        max_events: int = 100,
+        paginate: bool = False,
     ) -> str:
         """
         Filter log events by pattern across all streams in a log group.
@@ -149,31 +227,64 @@ class CloudWatchLogsSearchTools:
                 are interpreted as UTC; explicit offsets are honored.
             end_time: End time in ISO8601 format. Naive (offset-less) values are
                 interpreted as UTC; explicit offsets are honored.
+            max_events: Maximum number of events to return (default: 100)
+            paginate: Follow the nextToken chain until max_events accumulate
+                or the window is exhausted. Off by default: selective filters
+                return a token with few or zero events at every internal scan
+                boundary, so unconditional following can turn one request
+                into dozens.
 
         Returns:
             JSON string with filtered events
         """
         start_ts, end_ts = get_time_range(hours, start_time, end_time)
-        response = self.logs_client.filter_log_events(
-            logGroupName=log_group_name,
-            filterPattern=filter_pattern,
-            startTime=start_ts,
-            endTime=end_ts,
-            limit=100,
-        )
+        max_events = max(max_events, 1)
+
+        def fetch(next_token=None):
+            kwargs = {
+                "logGroupName": log_group_name,
+                "filterPattern": filter_pattern,
+                "startTime": start_ts,
+                "endTime": end_ts,
+                "limit": min(max_events, 10000),
+            }
+            if next_token:
+                kwargs["nextToken"] = next_token
+            return self.logs_client.filter_log_events(**kwargs)
 
-        events = response.get("events", [])
+        # With paginate on, follow the nextToken chain up to max_events,
+        # prefetching the next page in the background while the current one
+        # is formatted so the network round trip overlaps the local work.
+        # With it off (the default) this makes exactly one request, like the
+        # original implementation.
         formatted_events = []
+        response = await asyncio.to_thread(fetch)
+
+        while True:
+            events = response.get("events", [])
+            next_token = response.get("nextToken")
+            next_page = None
+            if (
+                paginate
+                and next_token
+                and len(formatted_events) + len(events) < max_events
+            ):
+                next_page = asyncio.create_task(asyncio.to_thread(fetch, next_token))
 
-        for event in events:
-            formatted_events.append(
+            # Events cluster within the same seconds, so the per-second
+            # memoized formatter pays the datetime construction once per
+            # distinct second instead of once per event
+            formatted_events.extend(
                 {
-                    "timestamp": datetime.fromtimestamp(
-                        event.get("timestamp", 0) / 1000
-                    ).isoformat(),
+                    "timestamp": iso_from_event_ms(event.get("timestamp", 0)),
                     "message": event.get("message"),
                     "logStreamName": event.get("logStreamName"),
                 }
+                for event in events
             )
+            if next_page is None:
+                break
+            response = await next_page
 
-        return json.dumps(formatted_events, indent=2)
+        del formatted_events[max_events:]
+        return dumps(formatted_events)
@@ -3,8 +3,139 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: Apache-2.0
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import functools
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import boto3
 import dateutil.parser
+from botocore.config import Config
+
+# Resolve the JSON encoder once at import: orjson's Rust encoder when it is
+# installed, stdlib json otherwise. Tool responses can carry hundreds of
+# multi-KB messages, so encoding is a measurable slice of response time.
+try:
+    import orjson
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+
+    def dumps(obj) -> str:
+        return json.dumps(obj, indent=2, default=str)
+
+
+@functools.lru_cache(maxsize=1024)
+def iso_from_ms(ts_ms: int) -> str:
+    """ISO8601 string for an epoch-millisecond timestamp, memoized.
+
+    Tool responses repeat the same window bounds across invocations
+    (explicit start/end windows especially), so the datetime construction
+    and formatting is paid once per distinct timestamp.
+    """
+    return datetime.fromtimestamp(ts_ms / 1000).isoformat()
+
+
+@functools.lru_cache(maxsize=2048)
+def _iso_second(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds).isoformat()
+
+
+def iso_from_event_ms(ts_ms: int) -> str:
+    """ISO8601 string for an event's epoch-millisecond timestamp.
+
+    Event timestamps are nearly all distinct at millisecond precision, so
+    memoizing them whole (as ``iso_from_ms`` does for window bounds) would
+    never hit. Instead the datetime construction and formatting is cached
+    per whole second — events cluster heavily within seconds — and only the
+    millisecond suffix is formatted per event.
+    """
+    seconds, millis = divmod(ts_ms, 1000)
+    base = _iso_second(seconds)
+    if millis:
+        return f"{base}.{millis:03d}000"
+    return base
+
+
+# Shared client settings, matching the resource layer: a larger HTTP
+# connection pool so the poller's repeated get_query_results calls and
+# concurrent tool invocations reuse connections instead of handshaking,
+# keepalive so pooled connections survive poll backoff gaps, and adaptive
+# retries that back off under CloudWatch throttling
+_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={"mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+
+@functools.lru_cache(maxsize=32)
+def get_logs_client(profile_name=None, region_name=None):
+    """Return a cached CloudWatch Logs client for a profile/region pair.
+
+    Constructing a boto3 Session re-parses credential and config files, and
+    each client load parses the service model JSON — tens of milliseconds per
+    tool invocation. Caching per (profile, region) lets every tool instance
+    for the same credentials share one client; boto3 clients are thread-safe
+    for concurrent API calls.
+    """
+    session = boto3.Session(profile_name=profile_name, region_name=region_name)
+    return session.client("logs", config=_CLIENT_CONFIG)
+
+
+# Interactive sessions tend to re-invoke the same query on the same groups
+# and window; each repeat costs a full Insights scan billed per byte. Completed
+# responses are kept for a few minutes, keyed on the tool, groups, query, and
+# minute-bucketed time window (bucketing makes back-to-back "last 24 hours"
+# calls hit the same key). Set CW_MCP_DISABLE_QUERY_CACHE=1 to bypass when
+# debugging.
+_QUERY_CACHE_TTL = 300.0
+_QUERY_CACHE_MAX = 256
+_query_cache: dict = {}
+
+
+def _cache_enabled() -> bool:
+    return not os.environ.get("CW_MCP_DISABLE_QUERY_CACHE")
+
+
+def query_cache_get(key):
+    """Return the cached response for key, or None if absent or expired."""
+    if not _cache_enabled():
+        return None
+    entry = _query_cache.get(key)
+    if entry is None:
+        return None
+    expires, value = entry
+    if time.monotonic() > expires:
+        del _query_cache[key]
+        return None
+    return value
+
+
+def query_cache_put(key, value) -> None:
+    """Store a response, evicting expired then oldest entries at capacity."""
+    if not _cache_enabled():
+        return
+    if len(_query_cache) >= _QUERY_CACHE_MAX:
+        now = time.monotonic()
+        for stale in [k for k, (exp, _) in _query_cache.items() if exp < now]:
+            del _query_cache[stale]
+        while len(_query_cache) >= _QUERY_CACHE_MAX:
+            del _query_cache[next(iter(_query_cache))]
+    _query_cache[key] = (time.monotonic() + _QUERY_CACHE_TTL, value)
+
+
+def chunked(items: list, size: int) -> list:
+    """Split a list into consecutive chunks of at most ``size`` items.
+
+    StartQuery accepts at most 50 log groups, so multi-group tools batch
+    their group lists through this before fanning the batches out
+    concurrently.
+    """
+    return [items[i : i + size] for i in range(0, len(items), size)]
 
 
 def _parse_iso_utc(value: str) -> datetime:
@@ -16,8 +147,16 @@ def _parse_iso_utc(value: str) -> datetime:
     epoch by the server's UTC offset. We pin naive values to UTC so the result
     is independent of where the server runs. Offset-aware values are returned
     unchanged so explicit offsets are always honored.
+
+    ``datetime.fromisoformat`` (C-accelerated, and accepting ``Z`` suffixes
+    since 3.11) handles the well-formed inputs that make up essentially all
+    traffic; ``dateutil`` stays as the fallback for the looser shapes it
+    accepts, with identical naive-as-UTC semantics on both paths.
     """
-    parsed = dateutil.parser.isoparse(value)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parsed = dateutil.parser.isoparse(value)
     if parsed.tzinfo is None:
         parsed = parsed.replace(tzinfo=timezone.utc)
     return parsed
@@ -37,16 +176,139 @@ def get_time_range(hours: int, start_time: str = None, end_time: str = None):
     Returns:
         Tuple of (start_timestamp, end_timestamp) in milliseconds since epoch
     """
+    # One C-level clock read covers both defaults; the datetime/timedelta
+    # construction and tz-aware timestamp() conversion are only needed for
+    # explicit ISO8601 inputs
+    now_ms = time.time_ns() // 1_000_000
+
     if start_time:
         start_ts = int(_parse_iso_utc(start_time).timestamp() * 1000)
     else:
-        start_ts = int(
-            (datetime.now(timezone.utc) - timedelta(hours=hours)).timestamp() * 1000
-        )
+        start_ts = now_ms - hours * 3_600_000
 
     if end_time:
         end_ts = int(_parse_iso_utc(end_time).timestamp() * 1000)
     else:
-        end_ts = int(datetime.now(timezone.utc).timestamp() * 1000)
+        end_ts = now_ms
 
     return start_ts, end_ts
+
+
+class _QueryPoller:
+    """Single background task servicing every outstanding Insights poll.
+
+    With several queries in flight (multi-batch correlations, batched tool
+    execution) each coroutine would otherwise run its own sleep/poll cycle;
+    one runner amortizes the event-loop wakeups while keeping an individual
+    backoff schedule and deadline per query.
+    """
+
+    _TICK = 0.25
+
+    def __init__(self):
+        self._pending: dict = {}
+        self._task = None
+
+    async def wait(self, logs_client, query_id: str, deadline: float) -> dict:
+        """Wait until the query finishes, times out, or fails."""
+        future = asyncio.get_running_loop().create_future()
+        now = time.monotonic()
+        self._pending[query_id] = {
+            "client": logs_client,
+            "deadline": deadline,
+            "future": future,
+            "next_check": now + 0.1,
+            "delay": 0.1,
+        }
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return await future
+
+    async def _run(self):
+        while self._pending:
+            await asyncio.sleep(self._TICK)
+            now = time.monotonic()
+            for query_id, entry in list(self._pending.items()):
+                if entry["future"].cancelled():
+                    self._pending.pop(query_id, None)
+                    continue
+                if now < entry["next_check"]:
+                    continue
+                try:
+                    response = await asyncio.to_thread(
+                        entry["client"].get_query_results, queryId=query_id
+                    )
+                except Exception as exc:
+                    self._pending.pop(query_id, None)
+                    # The waiter may have been cancelled while the call above
+                    # was in flight; resolving a done future would raise
+                    # InvalidStateError and kill this shared task, hanging
+                    # every other pending query
+                    if not entry["future"].done():
+                        entry["future"].set_exception(exc)
+                    continue
+                if entry["future"].done():
+                    self._pending.pop(query_id, None)
+                elif response["status"] != "Running":
+                    self._pending.pop(query_id, None)
+                    entry["future"].set_result(response)
+                elif now > entry["deadline"]:
+                    self._pending.pop(query_id, None)
+                    entry["future"].set_result({"status": "Timeout", "results": []})
+                else:
+                    entry["delay"] = min(entry["delay"] * 1.5, 2.0)
+                    entry["next_check"] = now + entry["delay"]
+
+
+_query_poller = _QueryPoller()
+
+
+async def poll_query_results(logs_client, query_id: str, timeout: float = 60.0):
+    """Poll a CloudWatch Logs Insights query until it finishes.
+
+    Checks once eagerly — small queries often complete almost synchronously —
+    then hands the query to the shared poller task, which services all
+    outstanding queries with per-query exponential backoff (100 ms up to a
+    2 s cap). Blocking boto3 calls run via asyncio.to_thread.
+
+    Args:
+        logs_client: boto3 CloudWatch Logs client
+        query_id: The queryId returned by start_query
+        timeout: Seconds to wait before giving up (default: 60)
+
+    Returns:
+        The final get_query_results response, or a synthetic
+        ``{"status": "Timeout", "results": []}`` response on timeout
+    """
+    deadline = time.monotonic() + timeout
+    response = await asyncio.to_thread(logs_client.get_query_results, queryId=query_id)
+    if response["status"] != "Running":
+        return response
+    return await _query_poller.wait(logs_client, query_id, deadline)
+
+
+async def collect_query_results(logs_client, query_id: str, response: dict) -> list:
+    """Collect every result row for a completed Insights query.
+
+    get_query_results pages large result sets via nextToken; the poller only
+    returns the first page. Follow the token chain one page at a time and
+    return the combined rows, so callers never silently truncate at a page
+    boundary. Queries whose results fit in one page pay no extra calls.
+
+    Args:
+        logs_client: boto3 CloudWatch Logs client
+        query_id: The queryId the response belongs to
+        response: The final response returned by poll_query_results
+
+    Returns:
+        List of result rows across all pages
+    """
+    results = list(response.get("results", []))
+    token = response.get("nextToken")
+    while token:
+        page = await asyncio.to_thread(
+            logs_client.get_query_results, queryId=query_id, nextToken=token
+        )
+        results.extend(page.get("results", []))
+        token = page.get("nextToken")
+    return results